@@ -0,0 +1,189 @@
+import time
+import numpy as np
+import calculations
+
+RESULT_COLUMNS = ("total_cost", "revenue", "profit", "profit_per_cookie")
+
+
+class BatchCalculator:
+    # Vectorized versions of the Calculator methods. Every method accepts
+    # scalars, NumPy arrays or pandas Series and broadcasts them together.
+    # invalid="raise" mirrors Calculator (ValueError on the first bad value),
+    # invalid="mask" returns NaN for the offending rows instead.
+
+    @staticmethod
+    def _check(bad, invalid: str, message: str):
+        if invalid not in ("raise", "mask"):
+            raise ValueError("invalid must be 'raise' or 'mask'.")
+        if invalid == "raise" and np.any(bad):
+            raise ValueError(message)
+
+    @staticmethod
+    def cost_per_unit(cost, units, invalid: str = "raise") -> np.ndarray:
+        cost = np.asarray(cost, dtype=float)
+        units = np.asarray(units, dtype=float)
+        bad = units <= 0
+        BatchCalculator._check(bad, invalid, "Units must be > 0.")
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(bad, np.nan, cost / np.where(bad, 1.0, units))
+
+    @staticmethod
+    def calculate_revenue(price, cookie_yield, invalid: str = "raise") -> np.ndarray:
+        price = np.asarray(price, dtype=float)
+        cookie_yield = np.asarray(cookie_yield, dtype=float)
+        bad = (price < 0) | (cookie_yield < 0)
+        BatchCalculator._check(bad, invalid, "Price and yield must be non-negative.")
+        return np.where(bad, np.nan, price * cookie_yield)
+
+    @staticmethod
+    def calculate_total_cost(unit_cost, quantity_used, recipe_codes=None, n_recipes=None) -> np.ndarray:
+        # Without recipe_codes this is the per-row ingredient cost.
+        # With recipe_codes (0..n-1 per row) the rows are summed per recipe.
+        line_costs = np.asarray(unit_cost, dtype=float) * np.asarray(quantity_used, dtype=float)
+        if recipe_codes is None:
+            return line_costs
+        recipe_codes = np.asarray(recipe_codes, dtype=np.intp)
+        return np.bincount(recipe_codes, weights=line_costs, minlength=n_recipes or 0)
+
+    @staticmethod
+    def calculate_profit(revenue, total_cost) -> np.ndarray:
+        return np.asarray(revenue, dtype=float) - np.asarray(total_cost, dtype=float)
+
+    @staticmethod
+    def profit_per_cookie(profit, cookie_yield, invalid: str = "raise") -> np.ndarray:
+        profit = np.asarray(profit, dtype=float)
+        cookie_yield = np.asarray(cookie_yield, dtype=float)
+        bad = cookie_yield <= 0
+        BatchCalculator._check(bad, invalid, "Cookies per batch must be > 0 for per-cookie profit.")
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(bad, np.nan, profit / np.where(bad, 1.0, cookie_yield))
+
+    @staticmethod
+    def evaluate(total_cost, cookie_yield, price, invalid: str = "raise") -> dict:
+        # One pass over arrays of batches: returns the same four numbers the
+        # GUI summary shows, as broadcast NumPy columns.
+        revenue = BatchCalculator.calculate_revenue(price, cookie_yield, invalid)
+        total_cost = np.broadcast_to(np.asarray(total_cost, dtype=float), revenue.shape)
+        profit = BatchCalculator.calculate_profit(revenue, total_cost)
+        ppc = BatchCalculator.profit_per_cookie(profit, cookie_yield, invalid)
+        return {
+            "total_cost": np.array(total_cost),
+            "revenue": revenue,
+            "profit": profit,
+            "profit_per_cookie": ppc,
+        }
+
+    @staticmethod
+    def price_recipes(ingredients, recipes, invalid: str = "raise"):
+        # ingredients: DataFrame with recipe, unit_cost, quantity_used
+        # recipes: DataFrame with recipe, cookie_yield, cookie_price
+        # Returns recipes with the result columns appended.
+        import pandas as pd
+
+        recipes = recipes.reset_index(drop=True)
+        codes = pd.Index(recipes["recipe"]).get_indexer(ingredients["recipe"])
+        if (codes < 0).any():
+            missing = ingredients["recipe"][codes < 0].iloc[0]
+            raise ValueError(f"Ingredient row refers to unknown recipe '{missing}'.")
+        totals = BatchCalculator.calculate_total_cost(
+            ingredients["unit_cost"].to_numpy(),
+            ingredients["quantity_used"].to_numpy(),
+            codes,
+            len(recipes),
+        )
+        result = BatchCalculator.evaluate(
+            totals,
+            recipes["cookie_yield"].to_numpy(),
+            recipes["cookie_price"].to_numpy(),
+            invalid,
+        )
+        out = recipes.copy()
+        for col in RESULT_COLUMNS:
+            out[col] = result[col]
+        return out
+
+
+class BatchSolver:
+    # Vectorized solver.Solver: break-even and target prices for many
+    # batches at once, same invalid="raise"/"mask" handling as BatchCalculator.
+
+    @staticmethod
+    def break_even_price(total_cost, cookie_yield, invalid: str = "raise") -> np.ndarray:
+        total_cost = np.asarray(total_cost, dtype=float)
+        cookie_yield = np.asarray(cookie_yield, dtype=float)
+        bad = cookie_yield <= 0
+        BatchCalculator._check(bad, invalid, "Cookies per batch must be > 0 to find a break-even price.")
+        return np.where(bad, np.nan, total_cost / np.where(bad, 1.0, cookie_yield))
+
+    @staticmethod
+    def break_even_yield(total_cost, price, whole_cookies: bool = False, invalid: str = "raise") -> np.ndarray:
+        total_cost = np.asarray(total_cost, dtype=float)
+        price = np.asarray(price, dtype=float)
+        bad = price <= 0
+        BatchCalculator._check(bad, invalid, "Price per cookie must be > 0 to break even.")
+        cookies = np.where(bad, np.nan, total_cost / np.where(bad, 1.0, price))
+        return np.ceil(cookies) if whole_cookies else cookies
+
+    @staticmethod
+    def price_for_profit(total_cost, cookie_yield, target_profit, invalid: str = "raise") -> np.ndarray:
+        return BatchSolver.break_even_price(
+            np.asarray(total_cost, dtype=float) + np.asarray(target_profit, dtype=float), cookie_yield, invalid)
+
+    @staticmethod
+    def price_for_margin(total_cost, cookie_yield, margin, invalid: str = "raise") -> np.ndarray:
+        margin = np.asarray(margin, dtype=float)
+        bad = margin >= 1
+        BatchCalculator._check(bad, invalid, "Target margin must be below 100%.")
+        grossed_up = np.asarray(total_cost, dtype=float) / np.where(bad, 1.0, 1 - margin)
+        return np.where(bad, np.nan, BatchSolver.break_even_price(grossed_up, cookie_yield, invalid))
+
+    @staticmethod
+    def solve_recipes(ingredients, recipes, margin=None, invalid: str = "raise"):
+        # recipes gets total_cost, break_even_price, break_even_yield (whole
+        # cookies at cookie_price) and, with margin, price_for_margin.
+        out = BatchCalculator.price_recipes(ingredients, recipes, invalid)
+        cost = out["total_cost"].to_numpy()
+        out["break_even_price"] = BatchSolver.break_even_price(cost, out["cookie_yield"].to_numpy(), invalid)
+        out["break_even_yield"] = BatchSolver.break_even_yield(
+            cost, out["cookie_price"].to_numpy(), whole_cookies=True, invalid=invalid)
+        if margin is not None:
+            out["price_for_margin"] = BatchSolver.price_for_margin(
+                cost, out["cookie_yield"].to_numpy(), margin, invalid)
+        return out
+
+
+# ------------------------- Benchmark -------------------------
+def _scalar_loop(total_cost, cookie_yield, price):
+    calc = calculations.Calculator()
+    out = []
+    for c, y, p in zip(total_cost.tolist(), cookie_yield.tolist(), price.tolist()):
+        revenue = calc.calculate_revenue(p, y)
+        profit = calc.calculate_profit(revenue, c)
+        out.append((c, revenue, profit, calc.profit_per_cookie(profit, y)))
+    return out
+
+
+def benchmark(n=1_000_000, repeat=3, seed=0):
+    rng = np.random.default_rng(seed)
+    total_cost = rng.uniform(5, 40, n)
+    cookie_yield = rng.integers(12, 120, n).astype(float)
+    price = rng.uniform(0.25, 3.0, n)
+
+    def best(fn):
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - start)
+        return min(times)
+
+    scalar = best(lambda: _scalar_loop(total_cost, cookie_yield, price))
+    vector = best(lambda: BatchCalculator.evaluate(total_cost, cookie_yield, price))
+    return {"rows": n, "scalar_s": scalar, "vectorized_s": vector, "speedup": scalar / vector}
+
+
+if __name__ == "__main__":
+    for rows in (10_000, 100_000, 1_000_000):
+        r = benchmark(rows)
+        print(f"{r['rows']:>9,} rows  scalar {r['scalar_s']:.3f}s  "
+              f"vectorized {r['vectorized_s']:.4f}s  x{r['speedup']:.0f}")
@@ -0,0 +1,64 @@
+import sys
+import time
+import tkinter as tk
+from tkinter import ttk
+from table_sync import TreeRowSync, format_row
+
+COLS = ("name", "unit_cost", "quantity_used", "total_cost")
+
+
+def make_rows(n, edited=None):
+    rows = []
+    for i in range(n):
+        unit_cost, qty = 0.01 * (i % 500), 1 + i % 7
+        if i == edited:
+            qty += 1
+        name = f"ingredient_{i}"
+        rows.append((name, format_row(name, unit_cost, qty, unit_cost * qty)))
+    return rows
+
+
+def full_rebuild(tree, rows):
+    # What _recalculate_and_refresh used to do
+    for r in tree.get_children():
+        tree.delete(r)
+    for _, values in rows:
+        tree.insert("", "end", values=values)
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def run(sizes=(1_000, 10_000, 50_000)):
+    root = tk.Tk()
+    root.withdraw()
+    results = []
+    for n in sizes:
+        rows, edited = make_rows(n), make_rows(n, edited=n // 2)
+
+        tree = ttk.Treeview(root, columns=COLS, show="headings")
+        full_rebuild(tree, rows)
+        before = timed(lambda: full_rebuild(tree, edited))
+        tree.destroy()
+
+        tree = ttk.Treeview(root, columns=COLS, show="headings")
+        sync = TreeRowSync(tree)
+        sync.sync(rows)
+        after = timed(lambda: sync.sync(edited))
+        tree.destroy()
+
+        results.append((n, before, after))
+        print(f"{n:>7,} rows  delete/reinsert {before * 1000:9.1f} ms  "
+              f"diff refresh {after * 1000:8.1f} ms")
+    root.destroy()
+    return results
+
+
+if __name__ == "__main__":
+    try:
+        run()
+    except tk.TclError as e:
+        sys.exit(f"Needs a display (try xvfb-run): {e}")
@@ -0,0 +1,53 @@
+import argparse
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+# Fails (exit 1) when importing cookie_gui gets slower than the budget or
+# pulls a heavy module back onto the startup path.
+
+HERE = Path(__file__).resolve().parent
+LAZY_MODULES = ("pandas", "numpy", "matplotlib", "sv_ttk", "darkdetect")
+PROBE = ("import sys, cookie_gui; "
+         "print(','.join(m for m in %r if m in sys.modules))" % (LAZY_MODULES,))
+
+
+def import_time_us(module="cookie_gui"):
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", PROBE],
+                          cwd=HERE, capture_output=True, text=True, check=True)
+    # lines look like: "import time:  self [us] | cumulative | imported package"
+    cumulative = None
+    for line in proc.stderr.splitlines():
+        m = re.match(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|\s*(\S+)\s*$", line)
+        if m and m.group(3) == module:
+            cumulative = int(m.group(2))
+    loaded = [m for m in proc.stdout.strip().split(",") if m]
+    return cumulative, loaded
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Startup import-time budget check for cookie_gui.")
+    parser.add_argument("--budget-ms", type=float, default=150.0)
+    parser.add_argument("--runs", type=int, default=5, help="best of N cold interpreter runs")
+    args = parser.parse_args(argv)
+
+    samples, loaded = [], []
+    for _ in range(args.runs):
+        us, loaded = import_time_us()
+        samples.append(us)
+    best_ms = min(samples) / 1000
+    print(f"import cookie_gui: {best_ms:.1f} ms (best of {args.runs}, budget {args.budget_ms:.0f} ms)")
+
+    failed = False
+    if loaded:
+        print(f"FAIL: heavy modules imported at startup: {', '.join(loaded)}")
+        failed = True
+    if best_ms > args.budget_ms:
+        print("FAIL: startup import time over budget")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
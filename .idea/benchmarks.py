@@ -0,0 +1,339 @@
+import argparse
+import itertools
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import calculations
+from cost_model import IncrementalCostModel
+from ingredient_store import IngredientStore
+
+# Benchmarks for the hot paths:
+#
+#   calculator.*   Calculator.calculate_total_cost at growing frame sizes (pandas)
+#   store.*        IngredientStore + IncrementalCostModel mutations (what the
+#                  GUI's _upsert_df_row / delete / cell edit do underneath)
+#   gui.*          the real CookieCostApp actions incl. table refresh
+#   chart.*        ChartPanel first render, full redraw and blitted update
+#
+# gui.* and chart.* need a display; on a headless machine run
+#
+#     xvfb-run python benchmarks.py --json results.json
+#
+# Each result is the median seconds per operation over --repeat runs.
+# --save-baseline writes the results to a file; --baseline compares against
+# one and exits 1 when any benchmark got slower than --tolerance allows.
+# Benchmarks whose dependencies are missing are reported as skipped.
+
+SIZES = (1_000, 10_000, 100_000, 1_000_000)
+QUICK_SIZES = (1_000, 10_000)
+TABLE_SIZES = (1_000, 5_000, 20_000)
+QUICK_TABLE_SIZES = (1_000,)
+
+
+class Skip(Exception):
+    pass
+
+
+def measure(fn, repeat=5, number=1, setup=None):
+    # Median seconds per call of fn() (setup() runs untimed before each repeat)
+    samples = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) / number)
+    return statistics.median(samples)
+
+
+def _rows(n):
+    for i in range(n):
+        yield f"ingredient_{i}", 0.01 * (i % 997), 1.0 + i % 5
+
+
+# ------------------------- Calculator -------------------------
+def bench_calculator(sizes, repeat):
+    try:
+        import numpy as np
+        import pandas as pd
+    except ImportError as e:
+        raise Skip(f"pandas/numpy not installed ({e})")
+    calc = calculations.Calculator()
+    rng = np.random.default_rng(0)
+    results = {}
+    for n in sizes:
+        df = pd.DataFrame({
+            "name": [f"ingredient_{i}" for i in range(n)],
+            "unit_cost": rng.uniform(0.01, 20.0, n),
+            "quantity_used": rng.uniform(0.1, 10.0, n),
+        })
+        results[f"calculator.total_cost[{n}]"] = measure(lambda: calc.calculate_total_cost(df), repeat)
+    return results
+
+
+# ------------------------- Store mutations -------------------------
+def bench_store(sizes, repeat, ops=2_000):
+    results = {}
+    for n in sizes:
+        store, model = IngredientStore(), IncrementalCostModel()
+
+        def fill():
+            store.clear()
+            model.reset()
+            for name, unit_cost, qty in _rows(n):
+                store.upsert(name, unit_cost, qty, model.upsert(name, unit_cost, qty))
+
+        results[f"store.fill[{n}]"] = measure(fill, repeat)
+        names = [f"ingredient_{i}" for i in range(0, n, max(1, n // ops))]
+
+        def upsert():
+            for name in names:
+                store.upsert(name, 1.5, 2.0, model.upsert(name, 1.5, 2.0))
+
+        def edit_quantity():
+            for name in names:
+                unit_cost = store.get(name)[0]
+                store.upsert(name, unit_cost, 3.0, model.upsert(name, unit_cost, 3.0))
+
+        def delete():
+            for name in names:
+                store.delete(name)
+                model.remove(name)
+
+        results[f"store.upsert[{n}]"] = measure(upsert, repeat, setup=fill) / len(names)
+        results[f"store.edit_quantity[{n}]"] = measure(edit_quantity, repeat, setup=fill) / len(names)
+        results[f"store.delete[{n}]"] = measure(delete, repeat, setup=fill) / len(names)
+    return results
+
+
+# ------------------------- GUI -------------------------
+def _make_app():
+    # A throwaway HOME keeps the user's config and saved tables out of it
+    import tkinter as tk
+
+    home = tempfile.mkdtemp(prefix="cookie-bench-")
+    os.environ["HOME"] = os.environ["USERPROFILE"] = home
+    try:
+        import cookie_gui
+        app = cookie_gui.CookieCostApp()
+    except tk.TclError as e:
+        raise Skip(f"no display ({e}); run under xvfb-run")
+    app.ask_before_delete.set(False)
+    app.update()
+    return app
+
+
+def _close_app(app):
+    app.worker.shutdown()
+    app._chart.close()
+    app.destroy()
+
+
+def _fill_app(app, n):
+    app.store.clear()
+    app.cost_model.reset()
+    for name, unit_cost, qty in _rows(n):
+        app._upsert_df_row(name, unit_cost, qty)
+    app._recalculate_and_refresh()
+    app.update()
+
+
+def _edit_cell(app, name, col_id, text):
+    # Same state _begin_cell_edit leaves behind, without the mouse event
+    import tkinter as tk
+    from tkinter import ttk
+
+    app._editing_info = (app._row_sync.item_for(name), col_id)
+    app._edit_var = tk.StringVar(master=app, value=text)
+    app._edit_entry = ttk.Entry(app.tree, textvariable=app._edit_var)
+    app._commit_cell_edit()
+
+
+def bench_gui(sizes, repeat, ops=20):
+    app = _make_app()
+    results = {}
+    try:
+        for n in sizes:
+            _fill_app(app, n)
+            names = [f"ingredient_{i}" for i in range(0, n, max(1, n // ops))][:ops]
+
+            ticks = itertools.count()
+
+            def refresh():
+                # one changed row, as after a single edit
+                app._upsert_df_row(names[0], 1.0 + next(ticks) % 7, 2.0)
+                app._recalculate_and_refresh()
+                app.update_idletasks()
+
+            results[f"gui.recalculate_and_refresh[{n}]"] = measure(refresh, repeat, number=5)
+
+            # Row-level actions go through the table, so keep it non-virtual
+            if n > app.virtual_threshold:
+                continue
+
+            def add_rows():
+                for k, name in enumerate(names):
+                    app.name_var.set(f"{name}_new")
+                    app.unit_cost_var.set("1.25")
+                    app.qty_var.set(str(k + 1))
+                    app._add_or_update_row()
+                app.update_idletasks()
+
+            def edit_cells():
+                for k, name in enumerate(names):
+                    _edit_cell(app, name, "#3", str(k + 2))
+                app.update_idletasks()
+
+            def delete_rows():
+                for name in names:
+                    app.tree.selection_set(app._row_sync.item_for(name))
+                    app._delete_selected()
+                app.update_idletasks()
+
+            refill = lambda: _fill_app(app, n)
+            results[f"gui.add_or_update_row[{n}]"] = measure(add_rows, repeat, setup=refill) / len(names)
+            results[f"gui.commit_cell_edit[{n}]"] = measure(edit_cells, repeat, setup=refill) / len(names)
+            results[f"gui.delete_selected[{n}]"] = measure(delete_rows, repeat, setup=refill) / len(names)
+    finally:
+        _close_app(app)
+    return results
+
+
+def bench_chart(repeat):
+    try:
+        import matplotlib  # noqa: F401
+    except ImportError as e:
+        raise Skip(f"matplotlib not installed ({e})")
+    app = _make_app()
+    results = {}
+    try:
+        chart = app._chart
+
+        def first_show():
+            chart.close()
+            chart.show(120.0, 250.0, 130.0)
+            app.update()
+
+        def full_redraw():
+            chart.canvas.draw()
+
+        ticks = itertools.count()
+
+        def blit_update():
+            # same y-range, so this takes the blit path
+            k = next(ticks) % 3
+            chart.update(120.0 + k, 250.0, 130.0 - k)
+            app.update_idletasks()
+
+        results["chart.first_show"] = measure(first_show, repeat)
+        results["chart.full_redraw"] = measure(full_redraw, repeat, number=5)
+        results["chart.blit_update"] = measure(blit_update, repeat, number=20)
+    finally:
+        _close_app(app)
+    return results
+
+
+# ------------------------- Reporting -------------------------
+def run_all(quick=False, repeat=5, gui=True):
+    sizes = QUICK_SIZES if quick else SIZES
+    table_sizes = QUICK_TABLE_SIZES if quick else TABLE_SIZES
+    suites = [
+        ("calculator", lambda: bench_calculator(sizes, repeat)),
+        ("store", lambda: bench_store(table_sizes, repeat)),
+    ]
+    if gui:
+        suites += [
+            ("gui", lambda: bench_gui(table_sizes, repeat)),
+            ("chart", lambda: bench_chart(repeat)),
+        ]
+    results, skipped = {}, {}
+    for name, suite in suites:
+        try:
+            results.update(suite())
+        except Skip as e:
+            skipped[name] = str(e)
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "repeat": repeat,
+            "quick": quick,
+        },
+        "results": results,
+        "skipped": skipped,
+    }
+
+
+def compare(current, baseline, tolerance):
+    # (name, baseline s, current s, ratio, regressed) for benchmarks in both
+    rows = []
+    for name, seconds in current["results"].items():
+        before = baseline["results"].get(name)
+        if before is None:
+            continue
+        ratio = seconds / before if before else float("inf")
+        rows.append((name, before, seconds, ratio, ratio > 1 + tolerance))
+    return rows
+
+
+def _fmt(seconds):
+    if seconds >= 1:
+        return f"{seconds:.2f} s"
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.2f} ms"
+    return f"{seconds * 1e6:.1f} us"
+
+
+def print_report(report, comparison=None):
+    for name, seconds in report["results"].items():
+        print(f"{name:<40} {_fmt(seconds):>12}")
+    for name, reason in report["skipped"].items():
+        print(f"{name + '.*':<40} {'skipped':>12}  {reason}")
+    if comparison:
+        print()
+        print(f"{'benchmark':<40} {'baseline':>12} {'current':>12} {'ratio':>7}")
+        for name, before, seconds, ratio, regressed in comparison:
+            flag = "  REGRESSION" if regressed else ""
+            print(f"{name:<40} {_fmt(before):>12} {_fmt(seconds):>12} {ratio:>6.2f}x{flag}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks for the cookie cost calculator hot paths.")
+    parser.add_argument("--quick", action="store_true", help="small sizes only")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per benchmark (median is reported)")
+    parser.add_argument("--no-gui", action="store_true", help="skip the benchmarks that need a display")
+    parser.add_argument("--json", type=Path, help="write results to this file")
+    parser.add_argument("--save-baseline", type=Path, help="write results as a baseline file")
+    parser.add_argument("--baseline", type=Path, help="compare against this baseline file")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed slowdown vs the baseline (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    report = run_all(quick=args.quick, repeat=args.repeat, gui=not args.no_gui)
+    for path in (args.json, args.save_baseline):
+        if path is not None:
+            path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    comparison = None
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        comparison = compare(report, baseline, args.tolerance)
+    print_report(report, comparison)
+
+    if comparison and any(regressed for *_, regressed in comparison):
+        print(f"FAIL: slower than baseline by more than {args.tolerance:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
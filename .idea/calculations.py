@@ -1,3 +1,6 @@
+import math
+
+
 class Calculator:
     @staticmethod
     def cost_per_unit(cost: float, units: float) -> float:
@@ -18,6 +21,11 @@ class Calculator:
         totals = df["unit_cost"] * df["quantity_used"]
         return float(totals.sum())
 
+    @staticmethod
+    def sum_line_costs(unit_costs, quantities) -> float:
+        # Same total as calculate_total_cost, for plain columns (no pandas)
+        return math.fsum(u * q for u, q in zip(unit_costs, quantities))
+
     @staticmethod
     def calculate_profit(revenue: float, total_cost: float) -> float:
         return revenue - total_cost
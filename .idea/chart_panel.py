@@ -0,0 +1,168 @@
+import tkinter as tk
+
+# matplotlib is imported on the first show(), not when the app starts
+
+LABELS = ["Total Cost", "Total Revenue", "Profit"]
+
+
+class ChartPanel:
+    # One profit-vs-cost window per app. The Figure/canvas are built on the
+    # first show() and reused afterwards: closing the window only hides it,
+    # and new totals update the bar heights and labels in place. Bars and
+    # labels are animated artists, so an update that keeps the y-axis range
+    # is a blit of the axes area instead of a full redraw.
+    # The Figure is created without pyplot, so nothing outlives close().
+
+    def __init__(self, master):
+        self.master = master
+        self.win = None
+        self.fig = None
+        self.ax = None
+        self.canvas = None
+        self._bars = None
+        self._texts = []
+        self._background = None
+        self._draw_cid = None
+
+    @property
+    def is_open(self) -> bool:
+        return self.win is not None and self.win.winfo_exists() and self.win.state() != "withdrawn"
+
+    def show(self, total_cost, revenue, profit):
+        if self.win is None:
+            self._build()
+        else:
+            self.win.deiconify()
+            self.win.lift()
+        self.update(total_cost, revenue, profit, force=True)
+
+    def update_if_open(self, total_cost, revenue, profit):
+        if self.is_open:
+            self.update(total_cost, revenue, profit)
+
+    def update(self, total_cost, revenue, profit, force=False):
+        values = [total_cost, revenue, profit]
+        offset = max(values) * 0.02 if max(values) else 0.02
+        for bar, text, v in zip(self._bars, self._texts, values):
+            bar.set_height(v)
+            text.set_position((bar.get_x() + bar.get_width() / 2, v + offset))
+            text.set_text(f"${v:,.2f}")
+
+        if self._rescale(values) or force or self._background is None:
+            self.canvas.draw_idle()
+        else:
+            self._blit()
+
+    def hide(self):
+        if self.win is not None:
+            self.win.withdraw()
+
+    def close(self):
+        # Release the window, canvas and figure now rather than at GC time
+        if self.win is None:
+            return
+        if self._draw_cid is not None:
+            self.canvas.mpl_disconnect(self._draw_cid)
+        try:
+            self.canvas.get_tk_widget().destroy()
+            self.win.destroy()
+        except tk.TclError:
+            pass
+        self.fig.clear()
+        self.win = self.fig = self.ax = self.canvas = None
+        self._bars = None
+        self._texts = []
+        self._background = None
+        self._draw_cid = None
+
+    # ------------------------- Internals -------------------------
+    def _build(self):
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+        self.win = tk.Toplevel(self.master)
+        self.win.title("Profit vs Cost")
+        self.win.geometry("700x450")
+        self.win.protocol("WM_DELETE_WINDOW", self.hide)
+
+        self.fig = Figure(figsize=(7, 4.5), dpi=100)
+        self.ax = self.fig.add_subplot()
+        self._bars = self.ax.bar(LABELS, [0.0, 0.0, 0.0], animated=True)
+        self._texts = [self.ax.text(i, 0.0, "", ha="center", animated=True) for i in range(len(LABELS))]
+        self.ax.set_title("Profit vs Cost for Cookie Batch")
+        self.ax.set_ylabel("USD ($)")
+        self.ax.grid(axis="y", linestyle="--", alpha=0.5)
+
+        self.canvas = FigureCanvasTkAgg(self.fig, master=self.win)
+        self.canvas.get_tk_widget().pack(fill="both", expand=True)
+        self._draw_cid = self.canvas.mpl_connect("draw_event", self._on_draw)
+
+    def _rescale(self, values) -> bool:
+        # Returns True when the y-range had to change (needs a full redraw)
+        low = min(0.0, min(values))
+        high = max(values)
+        span = (high - low) or 1.0
+        lo, hi = self.ax.get_ylim()
+        fits = lo <= low and high * 1.08 <= hi
+        too_loose = (hi - lo) > 2.5 * span
+        if fits and not too_loose:
+            return False
+        self.ax.set_ylim(low - 0.1 * span if low < 0 else 0.0, high + 0.15 * span)
+        return True
+
+    def _on_draw(self, _evt):
+        self._background = self.canvas.copy_from_bbox(self.fig.bbox)
+        self._draw_animated()
+
+    def _draw_animated(self):
+        for artist in (*self._bars, *self._texts):
+            self.ax.draw_artist(artist)
+
+    def _blit(self):
+        self.canvas.restore_region(self._background)
+        self._draw_animated()
+        self.canvas.blit(self.fig.bbox)
+
+
+# ------------------------- Leak check -------------------------
+def leak_check(opens=1_000):
+    # Opens/updates/hides the chart many times (and fully closes it every
+    # 100 opens); the number of live Figures and the traced memory must
+    # stay flat.
+    import gc
+    import tracemalloc
+    from matplotlib.figure import Figure
+
+    root = tk.Tk()
+    root.withdraw()
+    panel = ChartPanel(root)
+    tracemalloc.start()
+    baseline = None
+    for i in range(opens):
+        panel.show(10.0 + i % 7, 25.0, 15.0 - i % 7)
+        root.update()
+        panel.hide()
+        if i % 100 == 99:
+            panel.close()
+        if i == 99:
+            gc.collect()
+            baseline = tracemalloc.get_traced_memory()[0]
+    panel.close()
+    gc.collect()
+    grown = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    figures = sum(isinstance(o, Figure) for o in gc.get_objects())
+    root.destroy()
+    return figures, grown
+
+
+if __name__ == "__main__":
+    import sys
+
+    try:
+        live, grown = leak_check()
+    except tk.TclError as e:
+        sys.exit(f"Needs a display (try xvfb-run): {e}")
+    print(f"live figures after 1,000 opens: {live}, memory growth: {grown / 1024:.0f} KiB")
+    if live or grown > 5 * 1024 * 1024:
+        sys.exit("chart panel leaks")
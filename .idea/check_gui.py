@@ -0,0 +1,64 @@
+import argparse
+import sys
+
+from benchmarks import Skip, _close_app, _fill_app, _make_app
+
+# GUI regression checks (pass/fail, exit 1 on failure), kept out of the
+# benchmark suite so a failure is reported instead of aborting a timing or
+# --baseline run. Needs a display; on a headless machine run
+#   xvfb-run python .idea/check_gui.py
+
+
+def check_virtual_selection(app, n=200):
+    # Selecting a row in virtual mode must reach VirtualTable as well as the
+    # app's own handler, or the selection is lost on scroll/refresh
+    threshold, app.virtual_threshold = app.virtual_threshold, n // 2
+    try:
+        _fill_app(app, n)
+        item = app.tree.get_children()[1]
+        app.tree.selection_set(item)
+        app.update()
+        name = app.tree.set(item, "name")
+        if app._virtual._selected_name != name:
+            return f"VirtualTable did not see the selection ({app._virtual._selected_name!r} != {name!r})"
+        if app.name_var.get() != name:
+            return f"editor did not see the selection ({app.name_var.get()!r} != {name!r})"
+        return None
+    finally:
+        app.virtual_threshold = threshold
+        app.tree.selection_remove(app.tree.selection())
+        _fill_app(app, 0)
+
+
+CHECKS = {
+    "virtual_selection": check_virtual_selection,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="GUI regression checks for cookie_gui.")
+    parser.add_argument("--require-display", action="store_true",
+                        help="fail instead of skipping when there is no display")
+    args = parser.parse_args(argv)
+
+    try:
+        app = _make_app()
+    except Skip as e:
+        print(f"{'FAIL' if args.require_display else 'SKIP'}: {e}")
+        return 1 if args.require_display else 0
+    failed = False
+    try:
+        for name, check in CHECKS.items():
+            try:
+                problem = check(app)
+            except Exception as e:
+                problem = f"{type(e).__name__}: {e}"
+            print(f"{'FAIL' if problem else 'ok'}: {name}" + (f" - {problem}" if problem else ""))
+            failed |= bool(problem)
+    finally:
+        _close_app(app)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
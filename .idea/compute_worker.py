@@ -0,0 +1,189 @@
+import queue
+import threading
+import time
+
+
+class CancelToken:
+    def __init__(self):
+        self._cancelled = False
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    def cancel(self):
+        self._cancelled = True
+
+
+class BackgroundWorker:
+    # Runs heavy Calculator/pandas work on one daemon thread so the Tk event
+    # loop never blocks. Jobs are keyed: submitting a key that is already
+    # queued replaces the queued job, and a running job for that key gets its
+    # token cancelled and its result dropped (newest edit wins). Results
+    # come back on the Tk thread through after() polling, which only runs
+    # while jobs are outstanding. Job functions receive the CancelToken and
+    # must not touch Tk widgets.
+
+    def __init__(self, root, poll_ms: int = 10):
+        self.root = root
+        self.poll_ms = poll_ms
+        self._lock = threading.Condition()
+        self._pending = {}      # key -> (generation, fn, on_done, on_error, token)
+        self._order = []        # keys in submission order
+        self._running = {}      # key -> (generation, token)
+        self._latest = {}       # key -> newest generation submitted
+        self._results = queue.Queue()
+        self._generation = 0
+        self._outstanding = 0
+        self._poll_id = None
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="cookie-compute", daemon=True)
+        self._thread.start()
+
+    # ------------------------- Tk thread API -------------------------
+    def submit(self, key, fn, on_done=None, on_error=None):
+        with self._lock:
+            self._generation += 1
+            gen = self._generation
+            self._latest[key] = gen
+            token = CancelToken()
+            if key in self._pending:
+                self._pending[key][4].cancel()
+                self._outstanding -= 1
+                self._order.remove(key)
+            if key in self._running:
+                self._running[key][1].cancel()
+            self._pending[key] = (gen, fn, on_done, on_error, token)
+            self._order.append(key)
+            self._outstanding += 1
+            self._lock.notify()
+        self._schedule_poll()
+        return gen
+
+    def cancel(self, key):
+        with self._lock:
+            self._latest[key] = None
+            if key in self._pending:
+                self._pending.pop(key)[4].cancel()
+                self._order.remove(key)
+                self._outstanding -= 1
+            if key in self._running:
+                self._running[key][1].cancel()
+
+    def busy(self, key=None) -> bool:
+        with self._lock:
+            if key is None:
+                return self._outstanding > 0
+            return key in self._pending or key in self._running
+
+    def shutdown(self):
+        with self._lock:
+            self._stopped = True
+            for key in list(self._pending):
+                self._pending.pop(key)[4].cancel()
+            for _gen, token in self._running.values():
+                token.cancel()
+            self._order.clear()
+            self._lock.notify()
+        if self._poll_id is not None:
+            try:
+                self.root.after_cancel(self._poll_id)
+            except Exception:
+                pass
+            self._poll_id = None
+
+    # ------------------------- Worker thread -------------------------
+    def _run(self):
+        while True:
+            with self._lock:
+                while not self._order and not self._stopped:
+                    self._lock.wait()
+                if self._stopped:
+                    return
+                key = self._order.pop(0)
+                gen, fn, on_done, on_error, token = self._pending.pop(key)
+                self._running[key] = (gen, token)
+            try:
+                result, error = fn(token), None
+            except Exception as e:  # delivered to on_error on the Tk thread
+                result, error = None, e
+            with self._lock:
+                if self._running.get(key, (None,))[0] == gen:
+                    del self._running[key]
+            self._results.put((key, gen, token, result, error, on_done, on_error))
+
+    # ------------------------- Result delivery -------------------------
+    def _schedule_poll(self):
+        if self._poll_id is None and not self._stopped:
+            self._poll_id = self.root.after(self.poll_ms, self._poll)
+
+    def _poll(self):
+        self._poll_id = None
+        while True:
+            try:
+                key, gen, token, result, error, on_done, on_error = self._results.get_nowait()
+            except queue.Empty:
+                break
+            with self._lock:
+                self._outstanding -= 1
+                stale = token.cancelled or self._latest.get(key) != gen
+            if stale:
+                continue
+            if error is not None:
+                if on_error is not None:
+                    on_error(error)
+            elif on_done is not None:
+                on_done(result)
+        with self._lock:
+            more = self._outstanding > 0
+        if more:
+            self._schedule_poll()
+
+
+def run_in_slices(root, items, fn, on_done=None, budget_ms: float = 8.0):
+    # Applies fn(item) on the Tk thread a few milliseconds at a time, giving
+    # the event loop a turn between slices. Returns a CancelToken.
+    token = CancelToken()
+    it = iter(items)
+
+    def step():
+        if token.cancelled:
+            return
+        deadline = time.perf_counter() + budget_ms / 1000
+        for item in it:
+            fn(item)
+            if time.perf_counter() >= deadline:
+                root.after(1, step)
+                return
+        if on_done is not None:
+            on_done()
+
+    root.after(0, step)
+    return token
+
+
+class Debouncer:
+    # Coalesces bursts of trigger() calls (e.g. one per keystroke) into a
+    # single fn() call delay_ms after the last one, on the Tk thread.
+
+    def __init__(self, root, delay_ms: int, fn):
+        self.root = root
+        self.delay_ms = delay_ms
+        self.fn = fn
+        self._after_id = None
+
+    def trigger(self, *_args):
+        self.cancel()
+        self._after_id = self.root.after(self.delay_ms, self._fire)
+
+    def cancel(self):
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+
+    def _fire(self):
+        self._after_id = None
+        self.fn()
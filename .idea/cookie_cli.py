@@ -0,0 +1,213 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from batch_calc import BatchCalculator, RESULT_COLUMNS
+
+# Headless bulk costing. Input is one row per recipe ingredient:
+#   recipe, unit_cost, quantity_used[, name][, cookie_yield, cookie_price]
+# Rows of a recipe must be contiguous (sort by recipe); a recipe id that
+# comes back after other recipes is an error. Yield/price come from the ingredient
+# file (first row of each recipe) or from a separate --recipes file.
+# With --units, rows also carry name, unit (what unit_cost is priced per)
+# and recipe_unit (what quantity_used is measured in); see units.py.
+# Output is one row per recipe: recipe, cookie_yield, cookie_price,
+# total_cost, revenue, profit, profit_per_cookie.
+
+INGREDIENT_COLUMNS = ["recipe", "unit_cost", "quantity_used"]
+RECIPE_COLUMNS = ["recipe", "cookie_yield", "cookie_price"]
+UNIT_COLUMNS = ["name", "unit", "recipe_unit"]
+OUTPUT_COLUMNS = RECIPE_COLUMNS + list(RESULT_COLUMNS)
+
+
+def _format(path: Path, fmt=None):
+    fmt = fmt or path.suffix.lower().lstrip(".")
+    if fmt in ("jsonl", "ndjson"):
+        fmt = "json"
+    if fmt not in ("csv", "json", "parquet"):
+        raise ValueError(f"Unsupported file format '{fmt}' (use csv, json or parquet).")
+    return fmt
+
+
+def read_chunks(path, chunk_rows=500_000, fmt=None, columns=None):
+    path = Path(path)
+    fmt = _format(path, fmt)
+    if fmt == "csv":
+        yield from pd.read_csv(path, chunksize=chunk_rows, usecols=columns)
+    elif fmt == "json":
+        if path.suffix.lower() == ".json":
+            df = pd.read_json(path)
+            yield df[columns] if columns else df
+        else:
+            for chunk in pd.read_json(path, lines=True, chunksize=chunk_rows):
+                yield chunk[columns] if columns else chunk
+    else:
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows, columns=columns):
+            yield batch.to_pandas()
+
+
+def _check_contiguous(group, seen):
+    # Each recipe id may start only one run of rows in the whole input;
+    # otherwise its parts would be costed as separate partial recipes
+    ids = group["recipe"]
+    for recipe_id in ids[ids.ne(ids.shift())].tolist():
+        if recipe_id in seen:
+            raise ValueError(f"Rows of recipe '{recipe_id}' are not contiguous; sort the input by recipe.")
+        seen.add(recipe_id)
+    return group
+
+
+def recipe_groups(chunks):
+    # Re-cut chunks on recipe boundaries: the last recipe of each chunk may
+    # continue in the next one, so it is carried over.
+    seen = set()
+    carry = None
+    for chunk in chunks:
+        if carry is not None:
+            chunk = pd.concat([carry, chunk], ignore_index=True)
+        if chunk.empty:
+            continue
+        same = (chunk["recipe"].to_numpy() == chunk["recipe"].iloc[-1])[::-1]
+        trailing = len(chunk) if same.all() else int(same.argmin())
+        start = len(chunk) - trailing
+        carry = chunk.iloc[start:]
+        if start:
+            yield _check_contiguous(chunk.iloc[:start], seen)
+    if carry is not None and not carry.empty:
+        yield _check_contiguous(carry, seen)
+
+
+def cost_chunk(ingredients, recipes=None, invalid="raise", money=None, units=None):
+    # money: a money.MoneyCalculator for exact fixed-point results
+    # units: a units.UnitRegistry; unit_cost is converted to recipe units
+    if units is not None:
+        per_recipe_unit = units.factors(ingredients["recipe_unit"].to_numpy(),
+                                        ingredients["unit"].to_numpy(),
+                                        ingredients["name"].to_numpy())
+        ingredients = ingredients.assign(unit_cost=ingredients["unit_cost"].to_numpy(dtype=float) * per_recipe_unit)
+    if recipes is None:
+        recipes = ingredients.drop_duplicates("recipe")[RECIPE_COLUMNS]
+    else:
+        wanted = pd.unique(ingredients["recipe"])
+        missing = pd.Index(wanted).difference(recipes.index)
+        if len(missing):
+            raise ValueError(f"Recipe '{missing[0]}' is not in the recipes file.")
+        recipes = recipes.loc[wanted].reset_index()
+    calculator = money if money is not None else BatchCalculator
+    return calculator.price_recipes(ingredients, recipes, invalid)[OUTPUT_COLUMNS]
+
+
+class ResultWriter:
+    def __init__(self, path, fmt=None):
+        self.path = Path(path)
+        self.fmt = _format(self.path, fmt)
+        self._first = True
+        self._parquet = None
+        self._json = None
+
+    def write(self, df):
+        if self.fmt == "csv":
+            df.to_csv(self.path, mode="w" if self._first else "a", header=self._first, index=False)
+        elif self.fmt == "json":
+            if self._json is None:
+                self._json = open(self.path, "w", encoding="utf-8")
+            if len(df):
+                # one record per line; older pandas leave off the final newline
+                text = df.to_json(orient="records", lines=True)
+                self._json.write(text if text.endswith("\n") else text + "\n")
+        else:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._parquet is None:
+                self._parquet = pq.ParquetWriter(self.path, table.schema)
+            self._parquet.write_table(table)
+        self._first = False
+
+    def close(self):
+        if self._json is not None:
+            self._json.close()
+        if self._parquet is not None:
+            self._parquet.close()
+        if self._first and self.fmt == "csv":
+            pd.DataFrame(columns=OUTPUT_COLUMNS).to_csv(self.path, index=False)
+
+
+def run(ingredients_path, output_path, recipes_path=None, chunk_rows=500_000,
+        invalid="raise", in_format=None, out_format=None, rounding=None, use_units=False):
+    # rounding ("half_even"/"half_up") switches to exact fixed-point money
+    money = None
+    if rounding is not None:
+        from money import MoneyCalculator
+        money = MoneyCalculator(rounding)
+    units = None
+    if use_units:
+        from units import registry as units
+    recipes = None
+    columns = INGREDIENT_COLUMNS
+    if recipes_path:
+        recipes = pd.concat(read_chunks(recipes_path, chunk_rows, columns=RECIPE_COLUMNS),
+                            ignore_index=True).set_index("recipe")
+    else:
+        columns = INGREDIENT_COLUMNS + RECIPE_COLUMNS[1:]
+    if use_units:
+        columns = columns + UNIT_COLUMNS
+
+    writer = ResultWriter(output_path, out_format)
+    n_recipes = 0
+    try:
+        chunks = read_chunks(ingredients_path, chunk_rows, in_format, columns)
+        for group in recipe_groups(chunks):
+            result = cost_chunk(group, recipes, invalid, money, units)
+            writer.write(result)
+            n_recipes += len(result)
+    finally:
+        writer.close()
+    return n_recipes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk cookie recipe costing (no GUI).")
+    parser.add_argument("ingredients", help="recipe ingredient rows (.csv, .json/.jsonl, .parquet); "
+                                            "rows of each recipe must be contiguous (sorted by recipe)")
+    parser.add_argument("output", help="per-recipe results (.csv, .jsonl, .parquet)")
+    parser.add_argument("--recipes", help="file with recipe, cookie_yield, cookie_price "
+                                          "(otherwise read from the ingredient rows)")
+    parser.add_argument("--chunk-rows", type=int, default=500_000, help="rows read per chunk")
+    parser.add_argument("--invalid", choices=("raise", "mask"), default="raise",
+                        help="stop on bad yield/price, or write NaN for those recipes")
+    parser.add_argument("--exact", nargs="?", const="half_even", choices=("half_even", "half_up"),
+                        metavar="ROUNDING", help="fixed-point money (int64 micro-cents) with the given "
+                                                 "rounding rule (default half_even); results in cents")
+    parser.add_argument("--units", action="store_true",
+                        help="convert unit_cost from each row's unit to its recipe_unit "
+                             "(needs name, unit, recipe_unit columns)")
+    parser.add_argument("--input-format", choices=("csv", "json", "parquet"))
+    parser.add_argument("--output-format", choices=("csv", "json", "parquet"))
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    try:
+        n = run(args.ingredients, args.output, args.recipes, args.chunk_rows,
+                args.invalid, args.input_format, args.output_format, args.exact, args.units)
+    except (ValueError, KeyError, FileNotFoundError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    except ImportError as e:
+        if not (e.name or "").startswith("pyarrow"):
+            raise
+        print("error: pyarrow is required for parquet input/output (pip install pyarrow)", file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - start
+    print(f"Costed {n:,} recipes in {elapsed:.1f}s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,42 +1,48 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
-import pandas as pd
-import matplotlib
-matplotlib.use("TkAgg")
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from tkinter import ttk, messagebox, filedialog
 from pathlib import Path
 import json
-import sv_ttk
-import darkdetect
+import threading
 import calculations
+from cost_model import IncrementalCostModel, CostConsistencyError
+from cost_cache import CostCache
+from solver import Solver
+from chart_panel import ChartPanel
+from table_sync import TreeRowSync, format_row
+from ingredient_store import IngredientStore
+from virtual_table import VirtualTable
+from recipe_db import RecipeDB
+from compute_worker import BackgroundWorker, Debouncer, run_in_slices
+from instrumentation import Instrumentation, PerformancePanel
 class CookieCostApp(tk.Tk):
     def __init__(self):
         super().__init__()
-        try:
-            if hasattr(sv_ttk, "set_theme"):
-                sv_ttk.set_theme(darkdetect.theme())
-
-        except Exception:
-            pass
+        # Theme detection can be slow (darkdetect may spawn a process), so it
+        # runs after the window is up; matplotlib/pandas load on first use.
+        self.after(0, self._start_theme_detection)
         self.title("Cookie Cost Calculator")
         self.geometry("900x560")
         self.minsize(900, 560)
 
         # ----- State -----
-        self.df = pd.DataFrame(columns=["name", "unit_cost", "quantity_used", "total_cost"])
+        self.store = IngredientStore()
         # defaults (you can change in the GUI)
         self.cookie_yield = tk.DoubleVar(master=self, value=50.0)
         self.cookie_price = tk.DoubleVar(master=self, value=0.50)
         self._edit_entry = None
         self._editing_info = None  # tuple: (item_id, column_id)
+        # Above this many rows the table switches to virtual scrolling
+        self.virtual_threshold = 5000
         # ---- Config file path ----
         self._config_path = Path.home() / ".cookie_cost_gui.json"
 
 
         # ---- Load config & vars ----
         cfg = self._load_config()
+        self._config = cfg
         self.ask_before_delete = tk.BooleanVar(master=self, value=cfg.get("ask_before_delete", True))
+        self.live_update = tk.BooleanVar(master=self, value=cfg.get("live_update", True))
+        self.virtual_threshold = int(cfg.get("virtual_table_rows", self.virtual_threshold))
 
         # (keep your other vars here, e.g., cookie_yield, cookie_price, etc.)
 
@@ -45,19 +51,51 @@ class CookieCostApp(tk.Tk):
 
         # initialize calculator
         self.calc = calculations.Calculator()
+        # Running total updated per row; set "check_cost_consistency" in the
+        # config file to compare it against a full recompute on every refresh
+        self.cost_model = IncrementalCostModel(check_consistency=cfg.get("check_cost_consistency", False))
+        # Results keyed by store version (+ yield/price), shared by refresh, chart and solver
+        self._cost_cache = CostCache(maxsize=int(cfg.get("cost_cache_size", 256)))
+        self._checked_version = None
+        # Heavy work (table load, imports, consistency checks) runs off the Tk thread
+        self.worker = BackgroundWorker(self)
+
+        self.db = None
+        self._db_table = cfg.get("recipe_table", "default")
+        self._loading = False
 
         # Also auto-save when the checkbox is toggled
         self.ask_before_delete.trace_add("write", lambda *_: self._save_config())
+        self.live_update.trace_add("write", lambda *_: self._save_config())
+
+        # Opt-in timing spans/counters ("instrument"/"profile" in the config
+        # file); wrapping has to happen before the methods are bound to widgets
+        self.instr = Instrumentation.from_config(cfg)
+        self.instr.instrument(self, {
+            "_add_or_update_row": "add_or_update_row",
+            "_delete_selected": "delete_selected",
+            "_commit_cell_edit": "commit_cell_edit",
+            "_recalculate_and_refresh": "recalculate_and_refresh",
+            "_live_recalculate": "live_recalculate",
+            "_show_chart": "show_chart",
+        })
+        self._perf_panel = PerformancePanel(self, self.instr)
 
         # ----- Layout -----
         self._build_header()
         self._build_table()
         self._build_editor()
         self._build_summary()
+        self._build_solver()
         self._build_actions()
+        self._chart = ChartPanel(self)
+
+        # ---- Saved ingredient table (memory-mapped, see recipe_db.py) ----
+        loaded = self._open_saved_table()
 
-        # Seed data (optional; comment out if you want a blank start)
-        self._seed_rows()
+        # Seed data on first run (optional; comment out if you want a blank start)
+        if not loaded:
+            self._seed_rows()
 
         self._recalculate_and_refresh()
 
@@ -78,12 +116,22 @@ class CookieCostApp(tk.Tk):
         apply_button = (ttk.Button(bar, text="Apply", command=self._recalculate_and_refresh))
         apply_button.grid(row=0, column=4, sticky="w")
 
+        ttk.Checkbutton(bar, text="Live update", variable=self.live_update,
+                        onvalue=True, offvalue=False).grid(row=0, column=5, sticky="w", padx=(12, 0))
+        self.input_hint_lbl = ttk.Label(bar, text="", foreground="#c0392b")
+        self.input_hint_lbl.grid(row=0, column=6, sticky="w", padx=(12, 0))
+
         # Quick usability: Enter key applies
         self.yield_entry.bind("<Return>", lambda e: self._recalculate_and_refresh())
         self.price_entry.bind("<Return>", lambda e: self._recalculate_and_refresh())
 
+        # Live mode: typing updates only the summary, coalesced per burst of keys
+        self._live_debounce = Debouncer(self, 150, self._live_recalculate)
+        self.cookie_yield.trace_add("write", self._on_price_or_yield_typed)
+        self.cookie_price.trace_add("write", self._on_price_or_yield_typed)
+
         # Make spacing responsive
-        bar.columnconfigure(5, weight=1)
+        bar.columnconfigure(7, weight=1)
 
     def _build_table(self):
         wrapper = ttk.Frame(self, padding=(10, 0))
@@ -99,13 +147,15 @@ class CookieCostApp(tk.Tk):
         self.tree.column("unit_cost", width=120, anchor="e")
         self.tree.column("quantity_used", width=100, anchor="e")
         self.tree.column("total_cost", width=120, anchor="e")
+        self._row_sync = TreeRowSync(self.tree)
 
         vsb = ttk.Scrollbar(wrapper, orient="vertical", command=self.tree.yview)
         self.tree.configure(yscroll=vsb.set)
         self.tree.grid(row=0, column=0, sticky="nsew")
         vsb.grid(row=0, column=1, sticky="ns")
+        self._virtual = VirtualTable(self.tree, vsb, self.store, before_scroll=self._cancel_cell_edit)
 
-        self.tree.bind("<<TreeviewSelect>>", self._on_select_row)
+        self.tree.bind("<<TreeviewSelect>>", self._on_select_row, add="+")  # VirtualTable binds it too
         self.tree.bind("<Button-1>", self._clear_if_empty_click, add="+")
         self.tree.bind("<ButtonRelease-1>", self._clear_if_empty_click, add="+")
         self.tree.bind("<Escape>", lambda e: (self.tree.selection_remove(self.tree.selection()),
@@ -157,15 +207,42 @@ class CookieCostApp(tk.Tk):
 
         self.summary.columnconfigure(4, weight=1)
 
+    def _build_solver(self):
+        panel = ttk.Labelframe(self, text="Break-even / Target Margin", padding=(10, 6))
+        panel.pack(fill="x", padx=10)
+
+        self.target_margin = tk.StringVar(master=self, value="30")
+        ttk.Label(panel, text="Target margin (%):").grid(row=0, column=0, sticky="w", padx=(0, 6))
+        margin_entry = ttk.Entry(panel, textvariable=self.target_margin, width=8)
+        margin_entry.grid(row=0, column=1, sticky="w", padx=(0, 12))
+        margin_entry.bind("<Return>", lambda e: self._solve())
+        ttk.Button(panel, text="Solve", command=self._solve).grid(row=0, column=2, sticky="w", padx=(0, 8))
+        ttk.Button(panel, text="Use Target Price", command=self._use_target_price).grid(row=0, column=3, sticky="w")
+
+        self.break_even_price_lbl = ttk.Label(panel, text="Break-even price: -")
+        self.break_even_yield_lbl = ttk.Label(panel, text="Break-even cookies: -")
+        self.target_price_lbl = ttk.Label(panel, text="Price for target margin: -")
+        self.break_even_price_lbl.grid(row=1, column=0, columnspan=2, sticky="w", pady=(6, 0))
+        self.break_even_yield_lbl.grid(row=1, column=2, columnspan=2, sticky="w", pady=(6, 0), padx=(0, 18))
+        self.target_price_lbl.grid(row=1, column=4, sticky="w", pady=(6, 0))
+        self._target_price = None
+
+        panel.columnconfigure(5, weight=1)
+
     def _build_actions(self):
         actions = ttk.Frame(self, padding=(10, 8))
         actions.pack(fill="x")
 
         ttk.Button(actions, text="Show Profit vs Cost Chart", command=self._show_chart).pack(side="right")
+        ttk.Button(actions, text="Import Prices...", command=self._import_prices).pack(side="right", padx=(0, 8))
+        if self.instr.enabled:
+            ttk.Button(actions, text="Performance...", command=self._perf_panel.show).pack(side="right", padx=(0, 8))
         ttk.Button(actions, text="Clear All", command=self._clear_all).pack(side="left")
         ttk.Checkbutton(actions, text="Ask before deleting",
                         variable=self.ask_before_delete,
                         onvalue=True, offvalue=False).pack(side="left", padx=(8, 0))
+        self.status_lbl = ttk.Label(actions, text="")
+        self.status_lbl.pack(side="left", padx=(16, 0))
 
     # ------------------------- Helpers -------------------------
     def _seed_rows(self):
@@ -240,7 +317,9 @@ class CookieCostApp(tk.Tk):
             if not messagebox.askyesno("Delete", "Are you sure you want to delete the selected ingredient?"):
                 return
         name = self.tree.item(item, "values")[0]
-        self.df = self.df[self.df["name"] != name].reset_index(drop=True)
+        self.store.delete(name)
+        self.cost_model.remove(name)
+        self.instr.count("rows_deleted")
         self._recalculate_and_refresh()
         self._clear_editor()
 
@@ -254,16 +333,10 @@ class CookieCostApp(tk.Tk):
         return sel[0] if sel else None
 
     def _upsert_df_row(self, name, unit_cost, quantity_used):
-        match = (self.df["name"] == name)
-        if match.any():
-            idx = self.df.index[match][0]
-            self.df.at[idx, "unit_cost"] = unit_cost
-            self.df.at[idx, "quantity_used"] = quantity_used
-        else:
-            idx = len(self.df)
-            self.df.loc[idx] = {"name": name, "unit_cost": unit_cost,
-                                "quantity_used": quantity_used, "total_cost": 0.0}
-        self.df.at[idx, "total_cost"] = unit_cost * quantity_used
+        total_cost = self.cost_model.upsert(name, unit_cost, quantity_used)
+        self.store.upsert(name, unit_cost, quantity_used, total_cost)
+        self.instr.count("rows_upserted")
+
     def _begin_cell_edit(self, event):
         if self.tree.identify("region", event.x, event.y) != "cell":
             return
@@ -334,19 +407,20 @@ class CookieCostApp(tk.Tk):
         new_text = self._edit_var.get().strip()
         old_name = self.tree.set(item_id, "name")  # row key before changes
 
-        # Map column ids to df fields
+        # Map column ids to store fields
         if col_id == "#1":  # name
             if not new_text:
                 messagebox.showerror("Invalid input", "Ingredient name cannot be empty.")
                 return self._cancel_cell_edit()
             # Prevent duplicate names (unless it's the same row)
-            if (self.df["name"] == new_text).any() and new_text != old_name:
+            if new_text in self.store and new_text != old_name:
                 messagebox.showerror("Duplicate name", "An ingredient with that name already exists.")
                 return self._cancel_cell_edit()
-            # Update df
-            if (self.df["name"] == old_name).any():
-                idx = self.df.index[self.df["name"] == old_name][0]
-                self.df.at[idx, "name"] = new_text
+            # Update store
+            if old_name in self.store:
+                self.store.rename(old_name, new_text)
+                self.cost_model.rename(old_name, new_text)
+                self._row_sync.rename(old_name, new_text)
 
         elif col_id == "#2":  # unit_cost
             try:
@@ -357,9 +431,9 @@ class CookieCostApp(tk.Tk):
             if val < 0:
                 messagebox.showerror("Invalid input", "Unit cost must be positive.")
                 return self._cancel_cell_edit()
-            if (self.df["name"] == old_name).any():
-                idx = self.df.index[self.df["name"] == old_name][0]
-                self.df.at[idx, "unit_cost"] = val
+            row = self.store.get(old_name)
+            if row is not None:
+                self._upsert_df_row(old_name, val, row[1])
 
         elif col_id == "#3":  # quantity_used
             try:
@@ -370,13 +444,9 @@ class CookieCostApp(tk.Tk):
             if val < 0:
                 messagebox.showerror("Invalid input", "Quantity used must be positive.")
                 return self._cancel_cell_edit()
-            if (self.df["name"] == old_name).any():
-                idx = self.df.index[self.df["name"] == old_name][0]
-                self.df.at[idx, "quantity_used"] = val
-
-        # Recompute total for row (and all rows to be safe)
-        if not self.df.empty:
-            self.df["total_cost"] = self.df["unit_cost"] * self.df["quantity_used"]
+            row = self.store.get(old_name)
+            if row is not None:
+                self._upsert_df_row(old_name, row[0], val)
 
         self._cancel_cell_edit()
         self._recalculate_and_refresh()
@@ -393,9 +463,6 @@ class CookieCostApp(tk.Tk):
     def _recalculate_and_refresh(self):
         # Close any active cell editor before redrawing rows
         self._cancel_cell_edit()
-        # Recompute totals column just in case
-        total_cost = self.calc.calculate_total_cost(self.df)
-
         # Parse yield/price (with validation)
         try:
             yld = self._parse_float(self.yield_entry.get(), "Cookies per batch")
@@ -403,73 +470,228 @@ class CookieCostApp(tk.Tk):
         except Exception:
             return
 
-        revenue = self.calc.calculate_revenue(price, yld)
-        profit = self.calc.calculate_profit(revenue, total_cost)
-        profit_per_cookie = self.calc.profit_per_cookie(revenue, total_cost)
-
-        # Update labels
-        self.total_cost_lbl.config(text=f"Total cost: ${total_cost:,.2f}")
-        self.revenue_lbl.config(text=f"Revenue: ${revenue:,.2f}")
-        self.profit_lbl.config(text=f"Profit: ${profit:,.2f}")
-        self.ppc_lbl.config(text=f"Profit per cookie: ${profit_per_cookie:,.2f}")
-
-        # Refresh table rows
-        for r in self.tree.get_children():
-            self.tree.delete(r)
-        for _, row in self.df.iterrows():
-            self.tree.insert(
-                "",
-                "end",
-                values=(
-                    row["name"],
-                    f"{row['unit_cost']:.2f}",
-                    f"{row['quantity_used']:.2f}",
-                    f"{row['total_cost']:.2f}",
-                ),
-            )
+        self.input_hint_lbl.config(text="")
+        self._update_summary(self._summary(yld, price))
+        self._refresh_table()
+
+    def _on_price_or_yield_typed(self, *_):
+        if self.live_update.get():
+            self._live_debounce.trigger()
+
+    def _live_recalculate(self):
+        # Summary labels only (the table does not depend on price/yield);
+        # half-typed input shows a hint instead of a dialog
+        values = []
+        for entry, field in ((self.yield_entry, "Cookies per batch"), (self.price_entry, "Price per cookie")):
+            try:
+                value = float(entry.get())
+            except ValueError:
+                value = -1.0
+            if value < 0:
+                self.input_hint_lbl.config(text=f"'{field}' must be a non-negative number")
+                return
+            values.append(value)
+        self.input_hint_lbl.config(text="")
+        self._update_summary(self._summary(*values))
+
+    def _update_summary(self, s):
+        self.total_cost_lbl.config(text=f"Total cost: ${s['total_cost']:,.2f}")
+        self.revenue_lbl.config(text=f"Revenue: ${s['revenue']:,.2f}")
+        self.profit_lbl.config(text=f"Profit: ${s['profit']:,.2f}")
+        if s["profit_per_cookie"] is None:
+            self.ppc_lbl.config(text="Profit per cookie: -")
+        else:
+            self.ppc_lbl.config(text=f"Profit per cookie: ${s['profit_per_cookie']:,.2f}")
+        self._chart.update_if_open(s["total_cost"], s["revenue"], s["profit"])
+
+    def _total_cost(self):
+        # Running total is kept up to date by the row edits; the (optional)
+        # full consistency check runs in the background once per store version
+        if self.cost_model.check_consistency:
+            self._start_consistency_check()
+        return self.cost_model.total
+
+    def _start_consistency_check(self):
+        version, model = self.store.version, self.cost_model
+        if version == self._checked_version:
+            return
+        self._checked_version = version
+        # Snapshot the columns here (a memcpy); the worker only sums the copies
+        unit_costs = self.store.column("unit_cost")
+        quantities = self.store.column("quantity_used")
+
+        def done(expected):
+            if self.store.version != version or model is not self.cost_model:
+                return  # superseded by a newer edit
+            try:
+                model.check_against(expected)
+            except CostConsistencyError as e:
+                self._cost_cache.invalidate()
+                messagebox.showwarning("Cost mismatch", str(e))
+                self._recalculate_and_refresh()
+
+        self.worker.submit("verify", lambda token: self.calc.sum_line_costs(unit_costs, quantities), done)
+
+    def _set_status(self, text):
+        self.status_lbl.config(text=text)
+
+    def _summary(self, yld, price):
+        def compute():
+            total_cost = self._total_cost()
+            revenue = self.calc.calculate_revenue(price, yld)
+            profit = self.calc.calculate_profit(revenue, total_cost)
+            try:
+                profit_per_cookie = self.calc.profit_per_cookie(profit, yld)
+            except ValueError:
+                profit_per_cookie = None  # zero yield
+            return {"total_cost": total_cost, "revenue": revenue,
+                    "profit": profit, "profit_per_cookie": profit_per_cookie}
+        return self._cost_cache.get(("summary", self.store.version, yld, price), compute)
+
+    def _refresh_table(self):
+        self.instr.count("table_refreshes")
+        # Large tables only materialize the visible window of rows
+        if len(self.store) > self.virtual_threshold:
+            if not self._virtual.active:
+                self._row_sync.clear()
+                self._virtual.activate()
+            self._virtual.refresh()
+            if self.instr.enabled:
+                self.instr.count("rows_touched", min(len(self.store), self._virtual.page_size()))
+            return
+        if self._virtual.active:
+            self._virtual.deactivate()
+        # Refresh table rows: only rows whose values changed are touched
+        touched = self._row_sync.sync(
+            (name, format_row(name, unit_cost, qty, total))
+            for name, unit_cost, qty, total in self.store.rows()
+        )
+        self.instr.count("rows_touched", sum(touched))
 
     def _clear_all(self):
         if messagebox.askyesno("Clear all", "Remove all ingredients and reset totals?"):
-            self.df = pd.DataFrame(columns=["name", "unit_cost", "quantity_used", "total_cost"])
+            self.store.clear()
+            self.cost_model.reset()
             self._recalculate_and_refresh()
             self._clear_editor()
 
+    def _solve(self):
+        # Closed-form answers from the running total; no table refresh needed
+        total_cost = self._total_cost()
+        try:
+            yld = self._parse_float(self.yield_entry.get(), "Cookies per batch")
+            price = self._parse_float(self.price_entry.get(), "Price per cookie")
+        except Exception:
+            return
+        try:
+            margin = float(self.target_margin.get()) / 100
+        except ValueError:
+            messagebox.showerror("Invalid input", "'Target margin' must be a number.")
+            return
+        try:
+            self._target_price = Solver.price_for_margin(total_cost, yld, margin)
+            self.break_even_price_lbl.config(
+                text=f"Break-even price: ${Solver.break_even_price(total_cost, yld):,.2f}")
+            self.target_price_lbl.config(text=f"Price for target margin: ${self._target_price:,.2f}")
+        except ValueError as e:
+            self._target_price = None
+            messagebox.showerror("Cannot solve", str(e))
+            return
+        if price > 0:
+            cookies = Solver.break_even_yield(total_cost, price, whole_cookies=True)
+            self.break_even_yield_lbl.config(text=f"Break-even cookies: {cookies:,.0f}")
+        else:
+            self.break_even_yield_lbl.config(text="Break-even cookies: -")
+
+    def _use_target_price(self):
+        self._solve()
+        if self._target_price is not None:
+            self.cookie_price.set(round(self._target_price, 2))
+            self._recalculate_and_refresh()
+
+    def _import_prices(self):
+        path = filedialog.askopenfilename(
+            parent=self,
+            title="Import supplier price list",
+            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")],
+        )
+        if not path:
+            return
+        if self.worker.busy("import"):
+            messagebox.showinfo("Import running", "A price import is already running.")
+            return
+        known = self.store.column("name")
+
+        def parse(token):
+            # pandas is only needed here, so import on demand (off the Tk thread)
+            import price_import
+            return price_import.collect_price_updates(path, known, token=token)
+
+        def apply(item):
+            name, unit_cost = item
+            row = self.store.get(name)
+            if row is not None:  # may have been deleted while parsing
+                self._upsert_df_row(name, unit_cost, row[1])
+
+        def done(result):
+            import price_import
+            updates, stats = result
+
+            def finished():
+                self._set_status("")
+                self._recalculate_and_refresh()
+                messagebox.showinfo("Prices imported", price_import.format_stats(stats))
+
+            # Merge a few milliseconds at a time so the UI stays responsive
+            run_in_slices(self, list(updates.items()), apply, finished)
+
+        def failed(e):
+            self._set_status("")
+            messagebox.showerror("Import failed", str(e))
+
+        self._set_status("Importing prices...")
+        self.worker.submit("import", parse, done, failed)
+
     def _show_chart(self):
-        # Compute values
-        total_cost = float(self.df["total_cost"].sum()) if not self.df.empty else 0.0
+        # Compute values (cached for this ingredient version and price/yield)
         try:
             yld = float(self.cookie_yield.get())
             price = float(self.cookie_price.get())
+            s = self._summary(yld, price)
         except Exception:
             messagebox.showerror("Invalid input", "Fix price/yield values first.")
             return
-        revenue = self.calc.calculate_revenue(price, yld)
-        profit = self.calc.calculate_profit(revenue, total_cost)
 
-        labels = ["Total Cost", "Total Revenue", "Profit"]
-        values = [total_cost, revenue, profit]
+        # Reuses one window/figure; bars are updated in place
+        self._chart.show(s["total_cost"], s["revenue"], s["profit"])
 
-        # Pop up a window with the matplotlib figure embedded
-        win = tk.Toplevel(self)
-        win.title("Profit vs Cost")
-        win.geometry("700x450")
+    # ------------------------- Theme -------------------------
+    def _start_theme_detection(self):
+        result = {}
 
-        fig, ax = plt.subplots(figsize=(7, 4.5), dpi=100)
-        bars = ax.bar(labels, values)
-        ax.set_title("Profit vs Cost for Cookie Batch")
-        ax.set_ylabel("USD ($)")
-        ax.grid(axis="y", linestyle="--", alpha=0.5)
+        def detect():
+            try:
+                import darkdetect
+                result["theme"] = darkdetect.theme()
+            except Exception:
+                result["theme"] = None
 
-        for i, v in enumerate(values):
-            ax.text(i, v + max(values) * 0.02 if max(values) else 0.02, f"${v:,.2f}", ha="center")
+        worker = threading.Thread(target=detect, daemon=True)
+        worker.start()
 
-        canvas = FigureCanvasTkAgg(fig, master=win)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill="both", expand=True)
+        def apply():
+            if worker.is_alive():
+                self.after(50, apply)
+                return
+            # sv_ttk touches Tk, so it is loaded and applied on this thread
+            try:
+                import sv_ttk
+                if result.get("theme") and hasattr(sv_ttk, "set_theme"):
+                    sv_ttk.set_theme(result["theme"])
+            except Exception:
+                pass
 
-        # keep references to avoid garbage collection in some environments
-        win._fig = fig
-        win._canvas = canvas
+        self.after(50, apply)
 
     # ------------------------- Config helpers -------------------------
     def _load_config(self):
@@ -482,12 +704,15 @@ class CookieCostApp(tk.Tk):
         return {}
 
     def _save_config(self):
-        data = {
+        # Keep keys that were set by hand in the file (e.g. check_cost_consistency)
+        data = dict(self._config)
+        data.update({
             "ask_before_delete": bool(self.ask_before_delete.get()),
+            "live_update": bool(self.live_update.get()),
             # If you later want to persist other bits, add them here:
             # "cookie_yield": float(self.cookie_yield.get()),
             # "cookie_price": float(self.cookie_price.get()),
-        }
+        })
         try:
             with open(self._config_path, "w", encoding="utf-8") as f:
                 json.dump(data, f, indent=2)
@@ -495,10 +720,81 @@ class CookieCostApp(tk.Tk):
             # Don’t crash if writing fails; you could log to console if desired.
             pass
 
+    # ------------------------- Recipe database -------------------------
+    def _open_saved_table(self):
+        db_path = Path(self._config.get("database", Path.home() / ".cookie_cost_db")).expanduser()
+        try:
+            self.db = RecipeDB(db_path)
+            if self._db_table not in self.db.tables():
+                return False
+        except (OSError, ValueError):
+            self.db = None
+            return False
+
+        db, table, check = self.db, self._db_table, self.cost_model.check_consistency
+
+        def load(token):
+            store = db.load_store(table)
+            model = IncrementalCostModel(check_consistency=check)
+            model.load(store)
+            return store, model, db.meta(table)
+
+        # Large catalogs load on the worker; the window is usable meanwhile
+        self._loading = True
+        self._set_status("Loading saved ingredients...")
+        self.worker.submit("load", load, self._on_table_loaded, self._on_table_load_failed)
+        return True
+
+    def _on_table_loaded(self, result):
+        store, model, meta = result
+        self._loading = False
+        # Keep anything added while the table was loading
+        for name, unit_cost, qty, _total in list(self.store.rows()):
+            store.upsert(name, unit_cost, qty, model.upsert(name, unit_cost, qty))
+        self.store = store
+        self.cost_model = model
+        self._virtual.store = store
+        if "cookie_yield" in meta:
+            self.cookie_yield.set(meta["cookie_yield"])
+        if "cookie_price" in meta:
+            self.cookie_price.set(meta["cookie_price"])
+        self._set_status("")
+        self._recalculate_and_refresh()
+
+    def _on_table_load_failed(self, error):
+        self._loading = False
+        # Don't overwrite a table we could not read
+        self.db = None
+        self._set_status("")
+        messagebox.showerror("Load failed", f"Could not load saved ingredients: {error}")
+
+    def _save_table(self):
+        if self.db is None or self._loading:
+            return
+        meta = {}
+        try:
+            meta["cookie_yield"] = float(self.cookie_yield.get())
+            meta["cookie_price"] = float(self.cookie_price.get())
+        except (tk.TclError, ValueError):
+            pass
+        try:
+            # Only rows changed since the last save are written
+            self.db.save(self._db_table, self.store, meta)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Save failed", f"Could not save ingredients: {e}")
+
     def _on_close(self):
+        self._live_debounce.cancel()
+        self.worker.shutdown()
         self._save_config()
+        self._save_table()
+        if self.instr.trace_file is not None:
+            try:
+                self.instr.export(self.instr.trace_file)
+            except OSError:
+                pass
         try:
-            plt.close("all")
+            self._chart.close()
         except Exception:
             pass
         self.destroy()
@@ -0,0 +1,54 @@
+from collections import OrderedDict
+
+
+class CostCache:
+    # Bounded LRU memo for Calculator results. Keys should include the
+    # IngredientStore.version the result was computed from (plus any
+    # price/yield inputs), so edits never return stale numbers; invalidate()
+    # drops everything explicitly (e.g. after changing validation settings).
+
+    def __init__(self, maxsize: int = 256):
+        if maxsize < 1:
+            raise ValueError("Cache size must be >= 1.")
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, compute):
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            value = compute()  # exceptions propagate and nothing is cached
+            self._data[key] = value
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+            return value
+        self.hits += 1
+        self._data.move_to_end(key)
+        return value
+
+    def invalidate(self, predicate=None):
+        # Drop all entries, or only those whose key matches predicate(key)
+        if predicate is None:
+            self._data.clear()
+            return
+        for key in [k for k in self._data if predicate(k)]:
+            del self._data[key]
+
+    def __len__(self):
+        return len(self._data)
+
+    @property
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._data),
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,67 @@
+import math
+
+
+class CostConsistencyError(ValueError):
+    pass
+
+
+class IncrementalCostModel:
+    # Keeps the recipe total as a running sum of per-ingredient line costs so
+    # every upsert/delete/edit is an O(1) delta instead of a full recompute.
+    # check_consistency=True tells the owner to compare the running total
+    # against a full recompute of the store (the GUI does that on its worker
+    # thread and passes the result to check_against()).
+
+    def __init__(self, check_consistency: bool = False, tolerance: float = 1e-9):
+        self.check_consistency = check_consistency
+        self.tolerance = tolerance
+        self.reset()
+
+    def reset(self):
+        self._line_costs = {}
+        self._total = 0.0
+
+    @property
+    def total(self) -> float:
+        return self._total
+
+    def line_cost(self, name) -> float:
+        return self._line_costs.get(name, 0.0)
+
+    def upsert(self, name, unit_cost: float, quantity_used: float) -> float:
+        new = unit_cost * quantity_used
+        old = self._line_costs.get(name, 0.0)
+        self._line_costs[name] = new
+        self._total += new - old
+        return new
+
+    def remove(self, name):
+        old = self._line_costs.pop(name, None)
+        if old is not None:
+            self._total -= old
+            if not self._line_costs:
+                self._total = 0.0
+
+    def rename(self, old_name, new_name):
+        if old_name == new_name or old_name not in self._line_costs:
+            return
+        self._line_costs[new_name] = self._line_costs.pop(old_name)
+
+    def load(self, store):
+        # Bulk (re)build from an IngredientStore, e.g. after opening a saved table
+        self._line_costs = dict(zip(store.column("name"), store.column("total_cost")))
+        self.resync()
+
+    def resync(self):
+        # Drop accumulated float error from many +/- deltas.
+        self._total = math.fsum(self._line_costs.values())
+
+    def check_against(self, expected: float) -> float:
+        # expected: a full recompute done elsewhere (e.g. on a worker thread)
+        if not math.isclose(self._total, expected, rel_tol=self.tolerance, abs_tol=self.tolerance):
+            running = self._total
+            self.resync()
+            raise CostConsistencyError(
+                f"Running total {running!r} does not match full recompute {expected!r}."
+            )
+        return self._total
@@ -0,0 +1,194 @@
+from array import array
+from itertools import count
+
+COLUMNS = ("name", "unit_cost", "quantity_used", "total_cost")
+
+# Shared by all stores so a version number never repeats across instances
+_versions = count(1)
+
+
+class IngredientStore:
+    # Ingredient rows kept as compact columns (array('d') for the numbers)
+    # with a name -> slot index, so lookups, upserts and deletes are O(1).
+    # Appends grow the arrays in place (amortized), deletes leave a hole
+    # that is compacted once holes outnumber live rows. Row order is
+    # insertion order, same as the old DataFrame. `version` changes on every
+    # mutation and can key caches of derived results.
+
+    def __init__(self, rows=None):
+        self.clear()
+        for row in rows or ():
+            self.upsert(row["name"], row["unit_cost"], row["quantity_used"], row.get("total_cost"))
+
+    def clear(self):
+        self._names = []  # None marks a deleted slot
+        self._unit_cost = array("d")
+        self._quantity_used = array("d")
+        self._total_cost = array("d")
+        self._index = {}
+        self._holes = 0
+        # Changes since the last mark_saved(), for incremental persistence:
+        # name -> True (upserted) / False (deleted)
+        self._changes = {}
+        self._cleared = True
+        self.version = next(_versions)
+
+    # ------------------------- Lookups -------------------------
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, name):
+        return name in self._index
+
+    @property
+    def empty(self) -> bool:
+        return not self._index
+
+    def get(self, name):
+        slot = self._index.get(name)
+        if slot is None:
+            return None
+        return self._unit_cost[slot], self._quantity_used[slot], self._total_cost[slot]
+
+    def rows(self):
+        # (name, unit_cost, quantity_used, total_cost) in display order
+        for slot, name in enumerate(self._names):
+            if name is not None:
+                yield name, self._unit_cost[slot], self._quantity_used[slot], self._total_cost[slot]
+
+    def row_at(self, position: int):
+        self._compact()
+        return (self._names[position], self._unit_cost[position],
+                self._quantity_used[position], self._total_cost[position])
+
+    def position_of(self, name):
+        self._compact()
+        return self._index.get(name)
+
+    def column(self, field: str):
+        self._compact()
+        if field == "name":
+            return list(self._names)
+        return array("d", self._numeric(field))
+
+    # ------------------------- Mutations -------------------------
+    def upsert(self, name, unit_cost: float, quantity_used: float, total_cost: float = None) -> bool:
+        # Returns True when a new row was appended
+        if total_cost is None:
+            total_cost = unit_cost * quantity_used
+        slot = self._index.get(name)
+        if slot is not None:
+            self._unit_cost[slot] = unit_cost
+            self._quantity_used[slot] = quantity_used
+            self._total_cost[slot] = total_cost
+            self._changes[name] = True
+            self.version = next(_versions)
+            return False
+        self._changes[name] = True
+        self.version = next(_versions)
+        self._index[name] = len(self._names)
+        self._names.append(name)
+        self._unit_cost.append(unit_cost)
+        self._quantity_used.append(quantity_used)
+        self._total_cost.append(total_cost)
+        return True
+
+    def update(self, name, **fields):
+        slot = self._index[name]
+        for field, value in fields.items():
+            self._numeric(field)[slot] = value
+        self._changes[name] = True
+        self.version = next(_versions)
+
+    def rename(self, old_name, new_name):
+        if old_name == new_name:
+            return
+        if new_name in self._index:
+            raise ValueError(f"An ingredient named '{new_name}' already exists.")
+        slot = self._index.pop(old_name)
+        self._index[new_name] = slot
+        self._names[slot] = new_name
+        self._changes[old_name] = False
+        self._changes[new_name] = True
+        self.version = next(_versions)
+
+    def delete(self, name) -> bool:
+        slot = self._index.pop(name, None)
+        if slot is None:
+            return False
+        self._names[slot] = None
+        self._changes[name] = False
+        self.version = next(_versions)
+        self._holes += 1
+        if self._holes > len(self._index):
+            self._compact()
+        return True
+
+    # ------------------------- Change tracking -------------------------
+    def pending_changes(self):
+        # (cleared, upserted names, deleted names) since the last mark_saved()
+        upserted = [n for n, live in self._changes.items() if live]
+        deleted = [n for n, live in self._changes.items() if not live]
+        return self._cleared, upserted, deleted
+
+    def mark_saved(self):
+        self._changes = {}
+        self._cleared = False
+
+    # ------------------------- Internals -------------------------
+    def _numeric(self, field):
+        if field == "unit_cost":
+            return self._unit_cost
+        if field == "quantity_used":
+            return self._quantity_used
+        if field == "total_cost":
+            return self._total_cost
+        raise KeyError(field)
+
+    def _compact(self):
+        if not self._holes:
+            return
+        live = [slot for slot, name in enumerate(self._names) if name is not None]
+        self._names = [self._names[s] for s in live]
+        self._unit_cost = array("d", (self._unit_cost[s] for s in live))
+        self._quantity_used = array("d", (self._quantity_used[s] for s in live))
+        self._total_cost = array("d", (self._total_cost[s] for s in live))
+        self._index = {name: slot for slot, name in enumerate(self._names)}
+        self._holes = 0
+
+    # ------------------------- pandas view -------------------------
+    def to_dataframe(self):
+        import pandas as pd
+
+        self._compact()
+        return pd.DataFrame({
+            "name": pd.Series(self._names, dtype=object),
+            "unit_cost": pd.Series(self._unit_cost, dtype=float),
+            "quantity_used": pd.Series(self._quantity_used, dtype=float),
+            "total_cost": pd.Series(self._total_cost, dtype=float),
+        }, columns=list(COLUMNS))
+
+    @classmethod
+    def from_columns(cls, names, unit_cost, quantity_used, total_cost):
+        # Bulk load from contiguous float64 buffers (e.g. memory-mapped
+        # columns) without going through upsert() row by row.
+        store = cls()
+        store._names = list(names)
+        store._index = {name: slot for slot, name in enumerate(store._names)}
+        if len(store._index) != len(store._names):
+            raise ValueError("Ingredient names must be unique.")
+        for attr, col in (("_unit_cost", unit_cost), ("_quantity_used", quantity_used),
+                          ("_total_cost", total_cost)):
+            arr = array("d")
+            arr.frombytes(memoryview(col).cast("B"))
+            setattr(store, attr, arr)
+        store.mark_saved()
+        return store
+
+    @classmethod
+    def from_dataframe(cls, df):
+        store = cls()
+        totals = df["total_cost"] if "total_cost" in df else [None] * len(df)
+        for name, unit_cost, qty, total in zip(df["name"], df["unit_cost"], df["quantity_used"], totals):
+            store.upsert(name, float(unit_cost), float(qty), None if total is None else float(total))
+        return store
@@ -0,0 +1,242 @@
+import functools
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from pathlib import Path
+
+
+class _SpanStats:
+    # Running count/total/max per span plus the most recent durations for
+    # percentiles, so memory stays flat however long a session runs
+    __slots__ = ("count", "total", "max", "recent")
+
+    def __init__(self, samples):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent = deque(maxlen=samples)
+
+    def add(self, duration):
+        self.count += 1
+        self.total += duration
+        if duration > self.max:
+            self.max = duration
+        self.recent.append(duration)
+
+
+class Instrumentation:
+    # Opt-in timing spans and counters for GUI actions. Disabled (the
+    # default) it costs one attribute check per call: span() hands back a
+    # shared no-op context and count() returns at once. Enabled, every span
+    # is kept in a bounded ring buffer and exported as a Chrome/Perfetto
+    # trace (chrome://tracing, ui.perfetto.dev); per-span statistics keep
+    # running totals and the last `samples` durations. With profile=True a
+    # cProfile.Profile runs inside the outermost span only, so idle time in
+    # the Tk main loop never shows up in the profile.
+    #
+    # Config file keys: "instrument" (bool), "profile" (bool),
+    # "trace_file" (path, written on close), "trace_events" (buffer size).
+
+    def __init__(self, enabled=False, profile=False, max_events=50_000, trace_file=None, samples=1_000):
+        self.enabled = enabled or profile
+        self.trace_file = Path(trace_file).expanduser() if trace_file else None
+        self._events = deque(maxlen=max_events)
+        self._samples = samples
+        self._durations = {}
+        self.counters = defaultdict(int)
+        self._depth = 0
+        self._t0 = time.perf_counter()
+        self._profiler = None
+        if profile:
+            import cProfile
+            self._profiler = cProfile.Profile()
+
+    @classmethod
+    def from_config(cls, cfg: dict):
+        return cls(enabled=bool(cfg.get("instrument", False)),
+                   profile=bool(cfg.get("profile", False)),
+                   max_events=int(cfg.get("trace_events", 50_000)),
+                   trace_file=cfg.get("trace_file"))
+
+    # ------------------------- Recording -------------------------
+    def span(self, name, **args):
+        if not self.enabled:
+            return _NO_SPAN
+        return self._span(name, args)
+
+    @contextmanager
+    def _span(self, name, args):
+        outermost = self._depth == 0
+        self._depth += 1
+        if outermost and self._profiler is not None:
+            self._profiler.enable()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            if outermost and self._profiler is not None:
+                self._profiler.disable()
+            self._depth -= 1
+            stats = self._durations.get(name)
+            if stats is None:
+                stats = self._durations[name] = _SpanStats(self._samples)
+            stats.add(end - start)
+            self._events.append((name, start, end, threading.get_ident(), args))
+
+    def count(self, name, n=1):
+        if self.enabled:
+            self.counters[name] += n
+
+    def instrument(self, obj, methods: dict):
+        # Replaces obj.<method> with a wrapper timing it as span <name>.
+        # Must run before the methods are bound to widgets/commands.
+        if not self.enabled:
+            return
+        for attr, name in methods.items():
+            setattr(obj, attr, self._wrap(getattr(obj, attr), name))
+
+    def _wrap(self, fn, name):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with self.span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+
+    def reset(self):
+        self._events.clear()
+        self._durations.clear()
+        self.counters.clear()
+        if self._profiler is not None:
+            self._profiler.clear()
+
+    # ------------------------- Reporting -------------------------
+    def stats(self):
+        # name -> {count, total_ms, mean_ms, p95_ms, max_ms}, slowest total
+        # first; p95 is over the most recent samples
+        out = {}
+        for name, s in self._durations.items():
+            recent = sorted(s.recent)
+            out[name] = {
+                "count": s.count,
+                "total_ms": s.total * 1000,
+                "mean_ms": s.total / s.count * 1000,
+                "p95_ms": recent[min(len(recent) - 1, int(len(recent) * 0.95))] * 1000,
+                "max_ms": s.max * 1000,
+            }
+        return dict(sorted(out.items(), key=lambda kv: -kv[1]["total_ms"]))
+
+    def profile_summary(self, limit=20):
+        # Top functions by cumulative time as text ("" when not profiling)
+        if self._profiler is None:
+            return ""
+        import io
+        import pstats
+
+        buf = io.StringIO()
+        try:
+            pstats.Stats(self._profiler, stream=buf).sort_stats("cumulative").print_stats(limit)
+        except TypeError:  # nothing recorded yet
+            return ""
+        return buf.getvalue()
+
+    def export(self, path):
+        # Chrome trace JSON (+ <path>.prof with the cProfile data when profiling)
+        path = Path(path)
+        pid = os.getpid()
+        events = [{
+            "name": name, "ph": "X", "pid": pid, "tid": tid,
+            "ts": (start - self._t0) * 1e6, "dur": (end - start) * 1e6,
+            "args": args,
+        } for name, start, end, tid, args in self._events]
+        events += [{"name": name, "ph": "C", "pid": pid, "ts": (time.perf_counter() - self._t0) * 1e6,
+                    "args": {name: value}} for name, value in self.counters.items()]
+        data = {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "otherData": {"stats": self.stats(), "counters": dict(self.counters)},
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        if self._profiler is not None:
+            self._profiler.dump_stats(str(path.with_suffix(".prof")))
+        return path
+
+
+class _NoSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+class PerformancePanel:
+    # Small Toplevel listing span stats and counters, with export/reset.
+
+    def __init__(self, master, instr: Instrumentation):
+        self.master = master
+        self.instr = instr
+        self.win = None
+
+    def show(self):
+        if self.win is not None and self.win.winfo_exists():
+            self.win.deiconify()
+            self.win.lift()
+            self.refresh()
+            return
+        import tkinter as tk
+        from tkinter import ttk
+
+        self.win = tk.Toplevel(self.master)
+        self.win.title("Performance")
+        self.win.geometry("640x420")
+
+        cols = ("action", "count", "mean_ms", "p95_ms", "max_ms", "total_ms")
+        self.tree = ttk.Treeview(self.win, columns=cols, show="headings", height=10)
+        for c in cols:
+            self.tree.heading(c, text=c.replace("_", " "))
+            self.tree.column(c, width=200 if c == "action" else 80, anchor="w" if c == "action" else "e")
+        self.tree.pack(fill="both", expand=True, padx=10, pady=(10, 4))
+
+        self.counters_lbl = ttk.Label(self.win, text="", justify="left")
+        self.counters_lbl.pack(fill="x", padx=10)
+
+        buttons = ttk.Frame(self.win, padding=(10, 8))
+        buttons.pack(fill="x")
+        ttk.Button(buttons, text="Refresh", command=self.refresh).pack(side="left")
+        ttk.Button(buttons, text="Reset", command=self._reset).pack(side="left", padx=(8, 0))
+        ttk.Button(buttons, text="Export Trace...", command=self._export).pack(side="right")
+        self.refresh()
+
+    def refresh(self):
+        self.tree.delete(*self.tree.get_children())
+        for name, s in self.instr.stats().items():
+            self.tree.insert("", "end", values=(
+                name, s["count"], f"{s['mean_ms']:.2f}", f"{s['p95_ms']:.2f}",
+                f"{s['max_ms']:.2f}", f"{s['total_ms']:.1f}"))
+        counters = ", ".join(f"{k}: {v:,}" for k, v in sorted(self.instr.counters.items()))
+        self.counters_lbl.config(text=counters or "No counters yet.")
+
+    def _reset(self):
+        self.instr.reset()
+        self.refresh()
+
+    def _export(self):
+        from tkinter import filedialog, messagebox
+
+        path = filedialog.asksaveasfilename(
+            parent=self.win, title="Export trace", defaultextension=".json",
+            filetypes=[("Trace JSON", "*.json"), ("All files", "*.*")])
+        if not path:
+            return
+        try:
+            self.instr.export(path)
+        except OSError as e:
+            messagebox.showerror("Export failed", str(e), parent=self.win)
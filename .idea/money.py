@@ -0,0 +1,343 @@
+import time
+from decimal import Decimal, ROUND_HALF_EVEN, ROUND_HALF_UP
+
+import numpy as np
+
+# Fixed-point money: amounts are int64 micro-cents (1 dollar = 10**8) and
+# quantities are int64 millionths, so sums are exact and rounding happens
+# only where an operation asks for it, by an explicit rule:
+#
+#   "half_even"  ties go to the even neighbour (banker's rounding, default)
+#   "half_up"    ties go away from zero
+#
+# Multiplication and division are done in pieces that stay inside int64
+# whenever the result itself fits; OverflowError is raised otherwise
+# (about +/- $92 billion).
+
+MONEY_SCALE = 10 ** 8   # micro-cents per dollar
+QTY_SCALE = 10 ** 6     # quantity units per 1.0
+CENT = MONEY_SCALE // 100
+ROUNDING_MODES = ("half_even", "half_up")
+_DECIMAL_ROUNDING = {"half_even": ROUND_HALF_EVEN, "half_up": ROUND_HALF_UP}
+
+
+def _check_rounding(rounding):
+    if rounding not in ROUNDING_MODES:
+        raise ValueError(f"rounding must be one of {', '.join(ROUNDING_MODES)}.")
+
+
+def _div_round(num, den, rounding="half_even", base=0):
+    # base + num / den rounded to an integer; num int64 array, den > 0.
+    # Ties are decided on the whole value, so a result assembled from an
+    # exact part (base) and a remainder still rounds as if done in one go.
+    q, r = np.divmod(num, den)          # floor division: 0 <= r < den
+    whole = base + q
+    twice = 2 * r
+    if rounding == "half_even":
+        up = (twice > den) | ((twice == den) & (whole % 2 == 1))
+    else:
+        up = (twice > den) | ((twice == den) & (whole >= 0))
+    return whole + up
+
+
+def _guard(estimate):
+    # estimate: float64 magnitude of a result about to be formed in int64
+    if np.any(np.abs(estimate) >= 2.0 ** 62):
+        raise OverflowError("Money amount out of range for int64 micro-cents.")
+
+
+# ------------------------- Conversion -------------------------
+def _to_fixed(values, scale, rounding):
+    _check_rounding(rounding)
+    if isinstance(values, (str, Decimal)):
+        exact = (Decimal(values) * scale).quantize(Decimal(1), rounding=_DECIMAL_ROUNDING[rounding])
+        return np.int64(int(exact))
+    arr = np.asarray(values)
+    if arr.dtype.kind in "iu":
+        _guard(arr.astype(float) * scale)
+        return arr.astype(np.int64) * scale
+    if arr.dtype.kind == "O":
+        return np.array([_to_fixed(v, scale, rounding) for v in arr.ravel()],
+                        dtype=np.int64).reshape(arr.shape)
+    scaled = arr.astype(float) * scale
+    _guard(scaled)
+    if rounding == "half_even":
+        return np.rint(scaled).astype(np.int64)
+    return (np.sign(scaled) * np.floor(np.abs(scaled) + 0.5)).astype(np.int64)
+
+
+def to_money(values, rounding="half_even"):
+    # Dollars (float, int, str or Decimal; scalar or array) -> micro-cents.
+    # str/Decimal convert exactly; floats are rounded to the nearest micro-cent.
+    return _to_fixed(values, MONEY_SCALE, rounding)
+
+
+def to_quantity(values, rounding="half_even"):
+    return _to_fixed(values, QTY_SCALE, rounding)
+
+
+def to_dollars(amount):
+    # micro-cents -> float dollars (for display/plotting only)
+    return np.asarray(amount) / MONEY_SCALE
+
+
+def round_to_cents(amount, rounding="half_even"):
+    _check_rounding(rounding)
+    return _div_round(np.asarray(amount, dtype=np.int64), CENT, rounding) * CENT
+
+
+def format_money(amount, rounding="half_even") -> str:
+    cents = int(_div_round(np.asarray(amount, dtype=np.int64), CENT, rounding))
+    sign = "-" if cents < 0 else ""
+    dollars, cents = divmod(abs(cents), 100)
+    return f"{sign}${dollars:,}.{cents:02d}"
+
+
+# ------------------------- Arithmetic -------------------------
+def add(a, b):
+    a = np.asarray(a, dtype=np.int64)
+    b = np.asarray(b, dtype=np.int64)
+    _guard(a.astype(float) + b.astype(float))
+    return a + b
+
+
+def multiply(amount, quantity, rounding="half_even"):
+    # micro-cents x quantity (millionths) -> micro-cents.
+    # amount = hi * QTY_SCALE + lo, so amount * q / QTY_SCALE
+    # = hi * q + lo * q / QTY_SCALE, with only the second term rounded.
+    _check_rounding(rounding)
+    amount = np.asarray(amount, dtype=np.int64)
+    quantity = np.asarray(quantity, dtype=np.int64)
+    if amount.size and quantity.size and \
+            int(np.max(np.abs(amount))) * int(np.max(np.abs(quantity))) < 2 ** 63:
+        return _div_round(amount * quantity, QTY_SCALE, rounding)  # product fits as is
+    # Split both: amount = ah * S + al, quantity = qh * S + ql (S = QTY_SCALE,
+    # 0 <= al, ql < S), so amount * quantity / S
+    # = ah * qh * S + ah * ql + al * qh + al * ql / S
+    # with every partial product range-checked before it is formed and
+    # only al * ql (< S**2) left to round.
+    ah, al = np.divmod(amount, QTY_SCALE)
+    qh, ql = np.divmod(quantity, QTY_SCALE)
+    terms = ((ah, qh * QTY_SCALE), (ah, ql), (al, qh))
+    estimate = 0.0
+    for x, y in terms:
+        product = x.astype(float) * y.astype(float)
+        estimate = estimate + product
+        _guard(product)
+        _guard(estimate)
+    base = np.int64(0)
+    for x, y in terms:
+        base = base + x * y
+    return _div_round(al * ql, QTY_SCALE, rounding, base=base)
+
+
+def divide(amount, quantity, rounding="half_even"):
+    # micro-cents / quantity (millionths, > 0) -> micro-cents.
+    # Split on the divisor so amount * QTY_SCALE is never formed whole:
+    # amount = q * quantity + r, and r * QTY_SCALE / quantity is worked out
+    # by long division a few decimal digits at a time, so r * 10**k always
+    # fits in int64.
+    _check_rounding(rounding)
+    amount = np.asarray(amount, dtype=np.int64)
+    quantity = np.asarray(quantity, dtype=np.int64)
+    if np.any(quantity <= 0):
+        raise ValueError("Divisor must be > 0.")
+    _guard(amount.astype(float) / quantity.astype(float) * QTY_SCALE)
+    step = 0
+    largest = int(np.max(quantity)) if quantity.size else 1
+    while step < 6 and largest * 10 ** (step + 1) < 2 ** 63:
+        step += 1
+    if not step:
+        raise OverflowError("Divisor out of range for int64 long division.")
+    q, r = np.divmod(amount, quantity)
+    frac, digits = np.zeros_like(r), 6  # QTY_SCALE == 10**6
+    while digits:
+        k = min(step, digits)
+        d, r = np.divmod(r * 10 ** k, quantity)
+        frac = frac * 10 ** k + d
+        digits -= k
+    return _div_round(r, quantity, rounding, base=q * QTY_SCALE + frac)
+
+
+def total(amounts) -> int:
+    # Exact sum as a Python int; int64 accumulation when it cannot overflow
+    amounts = np.asarray(amounts, dtype=np.int64)
+    if not amounts.size:
+        return 0
+    largest = int(np.max(np.abs(amounts)))
+    if largest * amounts.size < 2 ** 63:
+        return int(amounts.sum())
+    # Chunks small enough that each int64 partial sum fits
+    step = max(1, 2 ** 62 // largest)
+    return sum(int(amounts[i:i + step].sum()) for i in range(0, amounts.size, step))
+
+
+def group_totals(amounts, codes, n_groups=None):
+    # Exact per-group sums (codes 0..n-1 per row), int64 micro-cents
+    amounts = np.asarray(amounts, dtype=np.int64)
+    codes = np.asarray(codes, dtype=np.intp)
+    n_groups = n_groups if n_groups is not None else (int(codes.max()) + 1 if codes.size else 0)
+    out = np.zeros(n_groups, dtype=np.int64)
+    if not amounts.size:
+        return out
+    order = np.argsort(codes, kind="stable")
+    sorted_codes = codes[order]
+    starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+    _guard(np.add.reduceat(np.abs(amounts[order]).astype(float), starts))
+    out[sorted_codes[starts]] = np.add.reduceat(amounts[order], starts)
+    return out
+
+
+class MoneyCalculator:
+    # Calculator/BatchCalculator in fixed point. Money arguments and results
+    # are int64 micro-cents, quantities/yields int64 millionths (see
+    # to_money/to_quantity); scalars and arrays broadcast together.
+
+    def __init__(self, rounding: str = "half_even"):
+        _check_rounding(rounding)
+        self.rounding = rounding
+
+    def cost_per_unit(self, cost, units):
+        return divide(cost, units, self.rounding)
+
+    def calculate_revenue(self, price, cookie_yield):
+        if np.any(np.asarray(price) < 0) or np.any(np.asarray(cookie_yield) < 0):
+            raise ValueError("Price and yield must be non-negative.")
+        return multiply(price, cookie_yield, self.rounding)
+
+    def calculate_total_cost(self, unit_cost, quantity_used, recipe_codes=None, n_recipes=None):
+        # Line costs are rounded once each; the sums are exact
+        line_costs = multiply(unit_cost, quantity_used, self.rounding)
+        if recipe_codes is None:
+            return total(line_costs)
+        return group_totals(line_costs, recipe_codes, n_recipes)
+
+    @staticmethod
+    def calculate_profit(revenue, total_cost):
+        return add(revenue, -np.asarray(total_cost, dtype=np.int64))
+
+    def profit_per_cookie(self, profit, cookie_yield):
+        if np.any(np.asarray(cookie_yield) <= 0):
+            raise ValueError("Cookies per batch must be > 0 for per-cookie profit.")
+        return divide(profit, cookie_yield, self.rounding)
+
+    def price_recipes(self, ingredients, recipes, invalid: str = "raise"):
+        # BatchCalculator.price_recipes computed in fixed point; the result
+        # columns come back as float dollars rounded to the cent.
+        import pandas as pd
+        from batch_calc import BatchCalculator, RESULT_COLUMNS
+
+        recipes = recipes.reset_index(drop=True)
+        codes = pd.Index(recipes["recipe"]).get_indexer(ingredients["recipe"])
+        if (codes < 0).any():
+            missing = ingredients["recipe"][codes < 0].iloc[0]
+            raise ValueError(f"Ingredient row refers to unknown recipe '{missing}'.")
+        totals = self.calculate_total_cost(to_money(ingredients["unit_cost"].to_numpy(dtype=float)),
+                                           to_quantity(ingredients["quantity_used"].to_numpy(dtype=float)),
+                                           codes, len(recipes))
+        price = recipes["cookie_price"].to_numpy(dtype=float)
+        cookie_yield = recipes["cookie_yield"].to_numpy(dtype=float)
+        bad_revenue = (price < 0) | (cookie_yield < 0)
+        BatchCalculator._check(bad_revenue, invalid, "Price and yield must be non-negative.")
+        bad_ppc = bad_revenue | (cookie_yield <= 0)
+        BatchCalculator._check(cookie_yield <= 0, invalid, "Cookies per batch must be > 0 for per-cookie profit.")
+
+        revenue = self.calculate_revenue(to_money(np.where(bad_revenue, 0.0, price)),
+                                         to_quantity(np.where(bad_revenue, 0.0, cookie_yield)))
+        profit = self.calculate_profit(revenue, totals)
+        ppc = self.profit_per_cookie(profit, to_quantity(np.where(bad_ppc, 1.0, cookie_yield)))
+        out = recipes.copy()
+        for col, values, bad in zip(RESULT_COLUMNS, (totals, revenue, profit, ppc),
+                                    (False, bad_revenue, bad_revenue, bad_ppc)):
+            out[col] = np.where(bad, np.nan, to_dollars(round_to_cents(values, self.rounding)))
+        return out
+
+
+# ------------------------- Benchmark -------------------------
+def benchmark(n=1_000_000, repeat=3, seed=0):
+    # float64 vs int64 fixed point vs Decimal on n rows: a plain sum of
+    # prices, and line costs (price x quantity) plus their grand total
+    rng = np.random.default_rng(seed)
+    unit_cost_cents = rng.integers(1, 5_000, n)
+    qty_millionths = rng.integers(1, 10_000_000, n)
+    unit_cost_f = unit_cost_cents / 100
+    qty_f = qty_millionths / QTY_SCALE
+    unit_cost_m = unit_cost_cents * CENT
+    quantity_m = qty_millionths.astype(np.int64)
+    unit_cost_d = [Decimal(int(c)).scaleb(-2) for c in unit_cost_cents]
+    qty_d = [Decimal(int(q)).scaleb(-6) for q in qty_millionths]
+    micro = Decimal(1).scaleb(-8)
+    calc = MoneyCalculator()
+
+    def best(fn):
+        times, result = [], None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = fn()
+            times.append(time.perf_counter() - start)
+        return min(times), result
+
+    out = {"rows": n}
+    for op, fns in (
+        ("sum", (lambda: float(np.sum(unit_cost_f)),
+                 lambda: total(unit_cost_m),
+                 lambda: sum(unit_cost_d))),
+        ("cost", (lambda: float(np.sum(unit_cost_f * qty_f)),
+                  lambda: calc.calculate_total_cost(unit_cost_m, quantity_m),
+                  lambda: sum((u * q).quantize(micro, rounding=ROUND_HALF_EVEN)
+                              for u, q in zip(unit_cost_d, qty_d)))),
+    ):
+        (float_s, float_total), (money_s, money_total), (decimal_s, decimal_total) = map(best, fns)
+        exact = int(decimal_total.scaleb(8))
+        out[op] = {
+            "float_s": float_s, "money_s": money_s, "decimal_s": decimal_s,
+            "float_error_microcents": round(float_total * MONEY_SCALE) - exact,
+            "money_exact": money_total == exact,
+            "speedup_vs_decimal": decimal_s / money_s,
+        }
+    return out
+
+
+def _self_check():
+    # Edge cases against Decimal, incl. quantities far above QTY_SCALE
+    def exact(a, q, op):
+        a, q = Decimal(int(a)), Decimal(int(q))
+        v = a * q / QTY_SCALE if op == "mul" else a * QTY_SCALE / q
+        return int(v.quantize(Decimal(1), rounding=ROUND_HALF_EVEN))
+
+    cases = [(to_money("1.00999999"), to_quantity(10_000_000), "mul"),
+             (to_money("-1.00999999"), to_quantity(10_000_000), "mul"),
+             (to_money("1234.56"), to_quantity("7654321.123456"), "mul"),
+             (to_money("0.00000005"), to_quantity("0.5"), "mul"),
+             (to_money("99999.99"), to_quantity("10000000"), "div"),
+             (to_money("-99999.99"), to_quantity("10000000"), "div"),
+             (to_money("1.00"), to_quantity("3"), "div"),
+             (to_money("5000000000"), to_quantity("0.000001"), "mul")]
+    for a, q, op in cases:
+        got = int(multiply(a, q) if op == "mul" else divide(a, q))
+        assert got == exact(a, q, op), (op, int(a), int(q), got, exact(a, q, op))
+    for a, q, op in ((to_money("90000000000"), to_quantity(2), "mul"),
+                     (to_money("90000000000"), to_quantity("0.5"), "div")):
+        try:
+            multiply(a, q) if op == "mul" else divide(a, q)
+        except OverflowError:
+            continue
+        raise AssertionError(f"{op} did not raise OverflowError")
+    rng = np.random.default_rng(1)
+    a = rng.integers(-10 ** 13, 10 ** 13, 2_000)
+    q = rng.integers(1, 10 ** 14, 2_000)
+    assert all(int(m) == exact(x, y, "mul") for m, x, y in zip(multiply(a, q // 10 ** 6), a, q // 10 ** 6))
+    assert all(int(d) == exact(x, y, "div") for d, x, y in zip(divide(a, q), a, q))
+    print("self-check: ok")
+
+
+if __name__ == "__main__":
+    _self_check()
+    for rows in (10_000, 100_000, 1_000_000):
+        r = benchmark(rows)
+        for op in ("sum", "cost"):
+            b = r[op]
+            print(f"{rows:>9,} rows {op:<4}  float {b['float_s'] * 1000:7.2f} ms  "
+                  f"int64 {b['money_s'] * 1000:7.2f} ms  Decimal {b['decimal_s'] * 1000:8.1f} ms  "
+                  f"x{b['speedup_vs_decimal']:.0f} vs Decimal  exact={b['money_exact']}  "
+                  f"float off by {b['float_error_microcents']} micro-cents")
@@ -0,0 +1,309 @@
+import os
+import struct
+import zlib
+from pathlib import Path
+
+import numpy as np
+
+# Unit-cost history per ingredient, in a directory:
+#
+#   ingredients.txt   one name per line; the line number is the ingredient code
+#   prices.log        append-only sequence of compressed blocks
+#
+# Block layout (little-endian): magic(8) rows(u64) payload_bytes(u64), then
+# zlib(day int32[rows] | code int32[rows] | unit_cost float64[rows]).
+# Days count from 1970-01-01. Appends only ever add bytes at the end (and
+# fsync); a torn last block from a crash is ignored when reading and cut
+# off before the next append.
+#
+# Queries are vectorized over the whole history: the observations become a
+# forward-filled (days x ingredients) price matrix, so a year of daily costs
+# for every recipe is one matrix product with the (ingredients x recipes)
+# quantity matrix instead of a Calculator call per day.
+
+MAGIC = b"CKPRC001"
+HEADER = struct.Struct("<8sQQ")
+LOG = "prices.log"
+NAMES = "ingredients.txt"
+
+
+def to_day(date) -> int:
+    # date / datetime / "YYYY-MM-DD" / numpy datetime64 -> days since epoch
+    return int(np.datetime64(date, "D").astype(np.int64))
+
+
+def to_days(dates) -> np.ndarray:
+    return np.asarray(dates, dtype="datetime64[D]").astype(np.int64).astype(np.int32)
+
+
+def day_range(start, end) -> np.ndarray:
+    # Inclusive, as datetime64[D]
+    return np.arange(np.datetime64(start, "D"), np.datetime64(end, "D") + 1)
+
+
+class PriceHistory:
+    def __init__(self, root):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._codes = {}
+        self._names = []
+        names_path = self.root / NAMES
+        if names_path.exists():
+            with open(names_path, "r", encoding="utf-8", newline="\n") as f:
+                for line in f:
+                    self._add_name(line.rstrip("\n"))
+        self._day, self._code, self._cost, self._log_end = self._read_log()
+        self._sorted = None
+
+    # ------------------------- Storage -------------------------
+    def _add_name(self, name):
+        self._codes[name] = len(self._names)
+        self._names.append(name)
+
+    def _read_log(self):
+        # -> (days, codes, costs, offset where the last complete block ends)
+        days, codes, costs = [], [], []
+        path = self.root / LOG
+        off = 0
+        if path.exists():
+            data = path.read_bytes()
+            off = 0
+            while off + HEADER.size <= len(data):
+                magic, rows, size = HEADER.unpack_from(data, off)
+                if magic != MAGIC:
+                    raise ValueError(f"{path} is corrupt at byte {off}.")
+                if off + HEADER.size + size > len(data):
+                    break  # torn final append
+                payload = zlib.decompress(data[off + HEADER.size:off + HEADER.size + size])
+                days.append(np.frombuffer(payload, "<i4", rows, 0))
+                codes.append(np.frombuffer(payload, "<i4", rows, 4 * rows))
+                costs.append(np.frombuffer(payload, "<f8", rows, 8 * rows))
+                off += HEADER.size + size
+        if not days:
+            return np.empty(0, np.int32), np.empty(0, np.int32), np.empty(0, np.float64), off
+        return (np.concatenate(days).astype(np.int32), np.concatenate(codes).astype(np.int32),
+                np.concatenate(costs).astype(np.float64), off)
+
+    def append(self, dates, names, unit_costs):
+        # One block of observations. dates/names may be scalars (broadcast).
+        unit_costs = np.atleast_1d(np.asarray(unit_costs, dtype=np.float64))
+        n = unit_costs.size
+        if np.any(unit_costs < 0):
+            raise ValueError("Unit cost must be positive.")
+        days = np.broadcast_to(to_days(dates), (n,)).astype("<i4")
+        names = [names] * n if isinstance(names, str) else list(names)
+        if len(names) != n:
+            raise ValueError("names and unit_costs must have the same length.")
+        new = [name for name in dict.fromkeys(names) if name not in self._codes]
+        for name in new:
+            if "\n" in name or "\r" in name:
+                raise ValueError(f"Ingredient name {name!r} contains a line break.")
+        if new:
+            with open(self.root / NAMES, "a", encoding="utf-8", newline="\n") as f:
+                f.write("".join(name + "\n" for name in new))
+                f.flush()
+                os.fsync(f.fileno())
+            for name in new:
+                self._add_name(name)
+        codes = np.array([self._codes[name] for name in names], dtype="<i4")
+        payload = zlib.compress(days.tobytes() + codes.tobytes() + unit_costs.astype("<f8").tobytes())
+        with open(self.root / LOG, "ab") as f:
+            if f.tell() != self._log_end:
+                f.truncate(self._log_end)  # drop a torn block before appending after it
+            f.write(HEADER.pack(MAGIC, n, len(payload)))
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+            self._log_end = f.tell()
+        self._day = np.concatenate([self._day, days.astype(np.int32)])
+        self._code = np.concatenate([self._code, codes.astype(np.int32)])
+        self._cost = np.concatenate([self._cost, unit_costs])
+        self._sorted = None
+
+    def append_store(self, date, store):
+        # Snapshot every unit cost of an IngredientStore on one date
+        self.append(date, store.column("name"), store.column("unit_cost"))
+
+    # ------------------------- Lookups -------------------------
+    @property
+    def ingredients(self):
+        return list(self._names)
+
+    def __len__(self):
+        return self._cost.size
+
+    def _by_day(self):
+        # Observations ordered by (day, append order); later appends win ties
+        if self._sorted is None:
+            order = np.argsort(self._day, kind="stable")
+            self._sorted = (self._day[order], self._code[order], self._cost[order])
+        return self._sorted
+
+    def prices_at(self, date) -> np.ndarray:
+        # Latest unit cost on or before date per ingredient (NaN: none yet)
+        day = to_day(date)
+        days, codes, costs = self._by_day()
+        upto = np.searchsorted(days, day, side="right")
+        out = np.full(len(self._names), np.nan)
+        out[codes[:upto]] = costs[:upto]  # in order, so the last write wins
+        return out
+
+    def daily_prices(self, start, end) -> np.ndarray:
+        # (days x ingredients) unit costs for every day in [start, end],
+        # carrying each price forward until it changes
+        first, last = to_day(start), to_day(end)
+        if last < first:
+            raise ValueError("end must not be before start.")
+        n_days = last - first + 1
+        days, codes, costs = self._by_day()
+        lo = np.searchsorted(days, first, side="left")
+        hi = np.searchsorted(days, last, side="right")
+
+        values = np.full((n_days, len(self._names)), np.nan)
+        have = np.zeros((n_days, len(self._names)), dtype=bool)
+        values[0] = self.prices_at(first - 1) if lo else np.nan
+        have[0] = ~np.isnan(values[0])
+        rows = days[lo:hi] - first
+        values[rows, codes[lo:hi]] = costs[lo:hi]
+        have[rows, codes[lo:hi]] = True
+
+        # forward fill: index of the last row with a value, per column
+        idx = np.where(have, np.arange(n_days)[:, None], 0)
+        np.maximum.accumulate(idx, axis=0, out=idx)
+        filled = values[idx, np.arange(len(self._names))]
+        filled[~np.maximum.accumulate(have, axis=0)] = np.nan
+        return filled
+
+    def quantity_matrix(self, recipes: dict) -> np.ndarray:
+        # {recipe: {ingredient: quantity_used}} -> (ingredients x recipes)
+        q = np.zeros((len(self._names), len(recipes)))
+        for j, quantities in enumerate(recipes.values()):
+            for name, qty in quantities.items():
+                code = self._codes.get(name)
+                if code is None:
+                    raise KeyError(f"No price history for ingredient '{name}'.")
+                q[code, j] = qty
+        return q
+
+    def recipe_costs(self, recipes: dict, start, end) -> np.ndarray:
+        # (days x recipes) batch cost for every day in [start, end]. An
+        # ingredient with no price yet makes that day's cost NaN.
+        prices = self.daily_prices(start, end)
+        q = self.quantity_matrix(recipes)
+        unknown = np.isnan(prices)
+        costs = np.where(unknown, 0.0, prices) @ q
+        if unknown.any():
+            # days x recipes: a needed price is unknown (float matmul uses BLAS)
+            costs[unknown.astype(float) @ (q != 0).astype(float) > 0] = np.nan
+        return costs
+
+    def recipe_cost_at(self, recipes: dict, date) -> np.ndarray:
+        return self.recipe_costs(recipes, date, date)[0]
+
+
+# ------------------------- Analytics -------------------------
+def rolling_mean(values, window: int) -> np.ndarray:
+    # Trailing mean over `window` rows (axis 0), skipping NaN; NaN until a
+    # window has at least one value
+    if window < 1:
+        raise ValueError("window must be >= 1.")
+    values = np.asarray(values, dtype=float)
+    ok = ~np.isnan(values)
+    sums = np.cumsum(np.where(ok, values, 0.0), axis=0)
+    counts = np.cumsum(ok, axis=0)
+    sums[window:] = sums[window:] - sums[:-window]
+    counts[window:] = counts[window:] - counts[:-window]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+
+
+def trend(values, days=None) -> np.ndarray:
+    # Least-squares slope per column (cost change per day), NaN-aware
+    values = np.asarray(values, dtype=float)
+    x = np.arange(values.shape[0], dtype=float) if days is None else np.asarray(days, dtype=float)
+    x = np.broadcast_to(x[:, None], values.shape)
+    ok = ~np.isnan(values)
+    n = ok.sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mx = np.where(ok, x, 0).sum(axis=0) / n
+        my = np.where(ok, values, 0).sum(axis=0) / n
+        dx = np.where(ok, x - mx, 0)
+        slope = (dx * np.where(ok, values - my, 0)).sum(axis=0) / (dx * dx).sum(axis=0)
+    return np.where(n >= 2, slope, np.nan)
+
+
+def save_trend_chart(path, dates, costs, labels, window: int = 7, title="Recipe cost trend"):
+    # PNG/PDF/SVG of daily costs with a rolling mean per recipe. Uses the
+    # Agg canvas directly (no pyplot, no display needed).
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(9, 4.5), dpi=100)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    costs = np.asarray(costs, dtype=float).reshape(len(dates), -1)
+    smooth = rolling_mean(costs, window)
+    for j, label in enumerate(labels):
+        line, = ax.plot(dates, costs[:, j], alpha=0.35, linewidth=1)
+        ax.plot(dates, smooth[:, j], color=line.get_color(), linewidth=2, label=f"{label} ({window}-day avg)")
+    ax.set_title(title)
+    ax.set_ylabel("Batch cost (USD $)")
+    ax.grid(axis="y", linestyle="--", alpha=0.5)
+    ax.legend(loc="best", fontsize="small")
+    fig.autofmt_xdate()
+    fig.savefig(path)
+    fig.clear()
+    return Path(path)
+
+
+if __name__ == "__main__":
+    import tempfile
+    import time
+
+    n_ingredients, n_recipes = 2_000, 5_000
+    rng = np.random.default_rng(0)
+    names = [f"ingredient_{i}" for i in range(n_ingredients)]
+    recipes = {f"recipe_{j}": {names[i]: float(rng.uniform(0.5, 5))
+                               for i in rng.choice(n_ingredients, 8, replace=False)}
+               for j in range(n_recipes)}
+    with tempfile.TemporaryDirectory() as tmp:
+        history = PriceHistory(tmp)
+        start = time.perf_counter()
+        history.append("2025-01-01", names, rng.uniform(0.1, 10, n_ingredients))
+        for day in day_range("2025-01-02", "2025-12-31"):
+            changed = rng.choice(n_ingredients, 40, replace=False)  # a few price changes a day
+            history.append(day, [names[i] for i in changed], rng.uniform(0.1, 10, changed.size))
+        append_s = time.perf_counter() - start
+        size = (Path(tmp) / LOG).stat().st_size
+
+        start = time.perf_counter()
+        reopened = PriceHistory(tmp)
+        open_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        costs = reopened.recipe_costs(recipes, "2025-01-01", "2025-12-31")
+        averages = rolling_mean(costs, 30)
+        batch_s = time.perf_counter() - start
+        print(f"{len(reopened):,} observations appended in {append_s:.2f}s ({size / 1024:.0f} KiB on disk), "
+              f"reopened in {open_s * 1000:.0f} ms")
+        print(f"daily cost of {n_recipes:,} recipes x {costs.shape[0]} days + 30-day averages: "
+              f"{batch_s * 1000:.0f} ms")
+
+    # A torn last block (crash mid-append) is dropped by the next append
+    with tempfile.TemporaryDirectory() as tmp:
+        history = PriceHistory(tmp)
+        history.append("2025-01-01", ["flour", "sugar"], [0.5, 0.8])
+        history.append("2025-01-02", "flour", 0.6)
+        log = Path(tmp) / LOG
+        os.truncate(log, log.stat().st_size - 5)
+        history = PriceHistory(tmp)
+        assert len(history) == 2
+        history.append("2025-01-03", "butter", 3.0)
+        history = PriceHistory(tmp)
+        assert len(history) == 3 and history.prices_at("2025-01-03").tolist() == [0.5, 0.8, 3.0]
+        try:
+            history.append("2025-01-04", ["egg", "bad\nname"], [0.2, 1.0])
+        except ValueError:
+            pass
+        assert PriceHistory(tmp).ingredients == ["flour", "sugar", "butter"]
+        print("torn-block recovery: ok")
@@ -0,0 +1,129 @@
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from batch_calc import BatchCalculator
+
+# Supplier price lists: one line per product with the ingredient name, the
+# pack price and the number of units in the pack. Files are read in chunks,
+# unit costs are computed per chunk with BatchCalculator.cost_per_unit and
+# merged into an IngredientStore, so memory stays bounded by chunk_rows.
+
+PRICE_COLUMNS = {"name": "name", "pack_price": "pack_price", "pack_size": "pack_size"}
+
+
+def _peak_rss_mb():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def read_price_chunks(path, chunk_rows=200_000, columns=None, sep=","):
+    columns = {**PRICE_COLUMNS, **(columns or {})}
+    reader = pd.read_csv(
+        path,
+        sep=sep,
+        chunksize=chunk_rows,
+        usecols=list(columns.values()),
+        dtype={columns["name"]: str, columns["pack_price"]: float, columns["pack_size"]: float},
+    )
+    rename = {v: k for k, v in columns.items()}
+    for chunk in reader:
+        chunk = chunk.rename(columns=rename)
+        chunk["unit_cost"] = BatchCalculator.cost_per_unit(
+            chunk["pack_price"].to_numpy(), chunk["pack_size"].to_numpy(), invalid="mask")
+        yield chunk
+
+
+def _clean_chunks(path, chunk_rows, columns, sep, stats):
+    # Drops lines with a non-positive pack size, a negative or missing price
+    # or a missing name and
+    # keeps the last line per name within each chunk.
+    for chunk in read_price_chunks(path, chunk_rows, columns, sep):
+        stats["rows"] += len(chunk)
+        valid = (np.isfinite(chunk["unit_cost"].to_numpy()) & (chunk["pack_price"].to_numpy() >= 0)
+                 & chunk["name"].notna().to_numpy())
+        stats["skipped"] += int((~valid).sum())
+        chunk = chunk[valid]
+        yield chunk.assign(name=chunk["name"].str.strip()).drop_duplicates("name", keep="last")
+
+
+def _finish(stats, start):
+    elapsed = time.perf_counter() - start
+    stats["seconds"] = elapsed
+    stats["rows_per_sec"] = stats["rows"] / elapsed if elapsed > 0 else float("inf")
+    stats["peak_rss_mb"] = _peak_rss_mb()
+    return stats
+
+
+def import_price_list(path, store, cost_model=None, add_missing=False, chunk_rows=200_000,
+                      columns=None, sep=","):
+    # Updates unit_cost (and total_cost) of ingredients already in the store.
+    # With add_missing=True unknown names are appended with quantity 0.
+    # Rows with a non-positive pack size or a negative/missing price are
+    # skipped; when a name repeats, the last line in the file wins.
+    stats = {"rows": 0, "updated": 0, "added": 0, "skipped": 0}
+    start = time.perf_counter()
+    for chunk in _clean_chunks(path, chunk_rows, columns, sep, stats):
+        for name, unit_cost in zip(chunk["name"].tolist(), chunk["unit_cost"].tolist()):
+            row = store.get(name)
+            if row is None:
+                if not add_missing:
+                    continue
+                qty = 0.0
+                stats["added"] += 1
+            else:
+                qty = row[1]
+                stats["updated"] += 1
+            total = cost_model.upsert(name, unit_cost, qty) if cost_model is not None else None
+            store.upsert(name, unit_cost, qty, total)
+    return _finish(stats, start)
+
+
+def collect_price_updates(path, known_names, chunk_rows=200_000, columns=None, sep=",", token=None):
+    # Same parsing as import_price_list, but never touches a store, so it can
+    # run on a worker thread. Returns ({name: unit_cost}, stats) for the
+    # names in known_names; token (CancelToken) stops between chunks.
+    stats = {"rows": 0, "updated": 0, "added": 0, "skipped": 0}
+    start = time.perf_counter()
+    known = pd.Index(list(known_names))
+    updates = {}
+    for chunk in _clean_chunks(path, chunk_rows, columns, sep, stats):
+        if token is not None and token.cancelled:
+            break
+        chunk = chunk[chunk["name"].isin(known)]
+        updates.update(zip(chunk["name"].tolist(), chunk["unit_cost"].tolist()))
+    stats["updated"] = len(updates)
+    return updates, _finish(stats, start)
+
+
+def format_stats(stats) -> str:
+    text = (f"{stats['rows']:,} lines in {stats['seconds']:.2f}s "
+            f"({stats['rows_per_sec']:,.0f} rows/s): {stats['updated']:,} updated, "
+            f"{stats['added']:,} added, {stats['skipped']:,} skipped")
+    if stats.get("peak_rss_mb") is not None:
+        text += f"; peak memory {stats['peak_rss_mb']:,.0f} MB"
+    return text
+
+
+if __name__ == "__main__":
+    import argparse
+    from ingredient_store import IngredientStore
+
+    parser = argparse.ArgumentParser(description="Stream a supplier price list into ingredient unit costs.")
+    parser.add_argument("prices", help="CSV with name, pack_price, pack_size columns")
+    parser.add_argument("--chunk-rows", type=int, default=200_000)
+    parser.add_argument("--out", help="write the resulting ingredient table to this CSV")
+    args = parser.parse_args()
+
+    store = IngredientStore()
+    result = import_price_list(args.prices, store, add_missing=True, chunk_rows=args.chunk_rows)
+    print(format_stats(result))
+    if args.out:
+        store.to_dataframe().to_csv(args.out, index=False)
@@ -0,0 +1,189 @@
+import time
+
+import numpy as np
+
+from batch_calc import BatchCalculator
+
+# How many batches of each recipe to bake with the ingredients on hand.
+#
+#   maximize    sum_j profit_j * batches_j
+#   subject to  sum_j quantity[i, j] * batches_j <= stock_i   (every ingredient i)
+#               min_batches_j <= batches_j <= max_batches_j
+#
+# profit_j is one batch's revenue (price x yield) minus its ingredient cost
+# (unit_cost @ quantity), the same numbers Calculator reports per batch.
+# integer=True asks for whole batches (MILP), otherwise the LP relaxation is
+# solved and its shadow prices say what one more unit of each ingredient is
+# worth. Both go through scipy's HiGHS solvers; scipy is only imported when
+# a plan is solved. The MILP stops once its plan is provably within
+# mip_rel_gap of the best possible profit (plan.gap is the gap reached);
+# proving exact optimality on hundreds of recipes can take minutes for a
+# fraction of a percent more profit.
+
+
+def _scipy():
+    try:
+        from scipy import sparse
+        from scipy.optimize import Bounds, LinearConstraint, linprog, milp
+    except ImportError as e:
+        raise ImportError("Production planning needs scipy (pip install scipy).") from e
+    return sparse, Bounds, LinearConstraint, linprog, milp
+
+
+class ProductionPlan:
+    def __init__(self, batches, profit, batch_profit, ingredient_use, stock, status, gap=0.0,
+                 shadow_prices=None, recipes=None, ingredients=None):
+        self.batches = batches                  # per recipe
+        self.profit = profit                    # total profit of the plan
+        self.batch_profit = batch_profit        # per recipe, one batch
+        self.ingredient_use = ingredient_use    # per ingredient
+        self.leftover = stock - ingredient_use
+        self.status = status
+        self.gap = gap                          # relative optimality gap (0 for LP)
+        self.shadow_prices = shadow_prices      # per ingredient (LP only)
+        self.recipes = recipes
+        self.ingredients = ingredients
+
+    def as_dict(self) -> dict:
+        # recipe id -> batches, for recipes that are baked at all
+        ids = self.recipes if self.recipes is not None else range(len(self.batches))
+        return {r: float(b) for r, b in zip(ids, self.batches) if b > 1e-9}
+
+    def bottlenecks(self, tol=1e-6):
+        # Ingredients the plan uses up
+        ids = self.ingredients if self.ingredients is not None else range(len(self.leftover))
+        return [i for i, left in zip(ids, self.leftover) if left <= tol]
+
+
+def batch_profit(quantity, unit_cost, cookie_yield, cookie_price):
+    # One batch of every recipe: revenue - ingredient cost (quantity is
+    # ingredients x recipes, dense or scipy.sparse)
+    revenue = BatchCalculator.calculate_revenue(cookie_price, cookie_yield)
+    cost = quantity.T @ np.asarray(unit_cost, dtype=float)
+    return BatchCalculator.calculate_profit(revenue, np.asarray(cost).ravel())
+
+
+def solve_plan(quantity, unit_cost, cookie_yield, cookie_price, stock, min_batches=0.0, max_batches=np.inf,
+               integer=True, mip_rel_gap=0.01, time_limit=None, recipes=None,
+               ingredients=None) -> ProductionPlan:
+    sparse, Bounds, LinearConstraint, linprog, milp = _scipy()
+    quantity = sparse.csr_array(quantity, dtype=float)
+    n_ingredients, n_recipes = quantity.shape
+    stock = np.broadcast_to(np.asarray(stock, dtype=float), (n_ingredients,)).copy()
+    lower = np.broadcast_to(np.asarray(min_batches, dtype=float), (n_recipes,)).copy()
+    upper = np.broadcast_to(np.asarray(max_batches, dtype=float), (n_recipes,)).copy()
+    if np.any(stock < 0):
+        raise ValueError("Stock on hand must be non-negative.")
+    if (quantity.data < 0).any():
+        raise ValueError("Quantity used must be positive.")
+    if np.any(lower < 0) or np.any(lower > upper):
+        raise ValueError("Batch limits must satisfy 0 <= min_batches <= max_batches.")
+
+    profit = batch_profit(quantity, unit_cost, cookie_yield, cookie_price)
+    # Unlimited ingredients need no row; +inf bounds are fine for HiGHS
+    limited = np.isfinite(stock)
+    rows, limits = quantity[limited], stock[limited]
+    options = {} if time_limit is None else {"time_limit": time_limit}
+
+    shadow, gap = None, 0.0
+    if integer:
+        options["mip_rel_gap"] = mip_rel_gap
+        res = milp(-profit, integrality=np.ones(n_recipes),
+                   bounds=Bounds(lower, upper),
+                   constraints=[LinearConstraint(rows, -np.inf, limits)] if rows.shape[0] else [],
+                   options=options)
+        batches = res.x
+        gap = getattr(res, "mip_gap", None) or 0.0
+    else:
+        res = linprog(-profit, A_ub=rows if rows.shape[0] else None, b_ub=limits if rows.shape[0] else None,
+                      bounds=np.column_stack([lower, upper]), method="highs", options=options)
+        batches = res.x
+        if batches is not None:
+            shadow = np.zeros(n_ingredients)
+            shadow[limited] = -res.ineqlin.marginals
+    if batches is None:
+        raise ValueError(_failure_message(res, quantity, profit, stock, lower, upper, recipes))
+    if integer:
+        batches = np.round(batches)
+    use = quantity @ batches
+    return ProductionPlan(batches, float(profit @ batches), profit, use, stock,
+                          res.message, gap, shadow, recipes, ingredients)
+
+
+def _failure_message(res, quantity, profit, stock, lower, upper, recipes):
+    # HiGHS often only says "infeasible or unbounded" (milp status 4), but
+    # with non-negative quantities the cause is easy to pin down: the
+    # minimum batches either fit in stock (feasible) or not, and a plan is
+    # unbounded when a profitable recipe has no cap and no limited ingredient.
+    if np.any(quantity @ lower > stock * (1 + 1e-9) + 1e-9):
+        return f"No feasible production plan: min_batches need more than the stock on hand ({res.message})"
+    uses_limited = np.asarray((quantity[np.isfinite(stock)] > 0).sum(axis=0)).ravel() > 0
+    free = np.flatnonzero((profit > 0) & np.isinf(upper) & ~uses_limited)
+    if res.status == 3 or free.size:
+        which = f"recipe '{recipes[free[0]] if recipes is not None else free[0]}'" if free.size else "a recipe"
+        return (f"Production plan is unbounded: {which} makes a profit, has no max_batches cap and "
+                f"uses no ingredient with limited stock ({res.message})")
+    return f"No feasible production plan: {res.message}"
+
+
+def plan_workspace(workspace, stock: dict, integer=True, max_batches=None, mip_rel_gap=0.01,
+                   time_limit=None) -> ProductionPlan:
+    # Plan over every recipe of a Workspace. stock maps ingredient id ->
+    # amount on hand (ingredients not listed are unlimited); max_batches
+    # optionally maps recipe id -> demand cap.
+    sparse = _scipy()[0]
+    recipes = list(workspace.recipes)
+    ingredients = list(workspace.unit_costs)
+    row = {ingredient_id: i for i, ingredient_id in enumerate(ingredients)}
+    r_idx, c_idx, values = [], [], []
+    for j, recipe_id in enumerate(recipes):
+        for ingredient_id, qty in workspace.recipes[recipe_id].quantities.items():
+            r_idx.append(row[ingredient_id])
+            c_idx.append(j)
+            values.append(qty)
+    quantity = sparse.coo_array((values, (r_idx, c_idx)), shape=(len(ingredients), len(recipes)))
+    unknown = set(stock) - set(row)
+    if unknown:
+        raise KeyError(f"Unknown ingredient '{sorted(unknown)[0]}' in stock.")
+    max_batches = max_batches or {}
+    return solve_plan(
+        quantity,
+        [workspace.unit_costs[i] for i in ingredients],
+        [workspace.recipes[r].cookie_yield for r in recipes],
+        [workspace.recipes[r].cookie_price for r in recipes],
+        [stock.get(i, np.inf) for i in ingredients],
+        max_batches=[max_batches.get(r, np.inf) for r in recipes],
+        integer=integer, mip_rel_gap=mip_rel_gap, time_limit=time_limit,
+        recipes=recipes, ingredients=ingredients,
+    )
+
+
+def benchmark(n_recipes=500, n_ingredients=300, per_recipe=8, seed=0):
+    rng = np.random.default_rng(seed)
+    sparse = _scipy()[0]
+    cols = np.repeat(np.arange(n_recipes), per_recipe)
+    rows = rng.integers(0, n_ingredients, cols.size)
+    quantity = sparse.coo_array((rng.uniform(0.5, 5.0, cols.size), (rows, cols)),
+                                shape=(n_ingredients, n_recipes)).tocsr()
+    unit_cost = rng.uniform(0.05, 2.0, n_ingredients)
+    cookie_yield = rng.integers(12, 60, n_recipes).astype(float)
+    cookie_price = rng.uniform(0.5, 2.0, n_recipes)
+    stock = rng.uniform(50, 500, n_ingredients)
+    max_batches = rng.integers(5, 40, n_recipes)
+
+    out = {"recipes": n_recipes, "ingredients": n_ingredients}
+    for integer in (False, True):
+        start = time.perf_counter()
+        plan = solve_plan(quantity, unit_cost, cookie_yield, cookie_price, stock,
+                          max_batches=max_batches, integer=integer)
+        out["milp" if integer else "lp"] = (time.perf_counter() - start, plan.profit, plan.gap)
+    return out
+
+
+if __name__ == "__main__":
+    for size in ((100, 50), (300, 200), (500, 300)):
+        r = benchmark(*size)
+        (lp_s, lp_profit, _), (milp_s, milp_profit, gap) = r["lp"], r["milp"]
+        print(f"{r['recipes']:>5} recipes x {r['ingredients']:>5} ingredients  "
+              f"LP {lp_s * 1000:7.1f} ms (profit {lp_profit:,.2f})  "
+              f"MILP {milp_s * 1000:7.1f} ms (profit {milp_profit:,.2f}, gap {gap:.2%})")
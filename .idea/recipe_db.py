@@ -0,0 +1,351 @@
+import json
+import mmap
+import os
+import struct
+import sys
+import uuid
+from array import array
+from contextlib import contextmanager
+from pathlib import Path
+
+from ingredient_store import IngredientStore
+
+# On-disk ingredient tables (one per recipe) in a directory:
+#
+#   manifest.json   table name -> ordered segment files + recipe meta
+#   <hex>.seg       one segment: a batch of upserted/deleted rows
+#
+# Segment layout (native byte order, recorded in the manifest; every column
+# starts on an 8-byte boundary so it can be viewed in place):
+#
+#   header   magic(8) rows(u64) name_bytes(u64)
+#   op       int8[rows]     1 = upsert, 0 = delete   (padded to 8)
+#   unit_cost, quantity_used, total_cost   float64[rows] each
+#   name_offsets   int64[rows + 1]
+#   names          UTF-8, each name followed by a NUL byte
+#
+# Segments are opened with mmap and the columns are memoryview casts over
+# the mapping, so opening a table copies nothing. Saving an IngredientStore
+# appends a segment holding only the rows changed since the last save; once
+# a table has max_segments segments (or was cleared) it is rewritten as a
+# single segment. Every file is written to a temp name, fsynced and renamed,
+# and a save only becomes visible when the manifest is replaced.
+#
+# Several RecipeDB instances (GUI windows, scripts) may share a directory:
+# save/delete_table/compact hold an exclusive lock on manifest.lock, re-read
+# the manifest and change only their own table in it, and only delete the
+# segment files they themselves replaced.
+
+MAGIC = b"CKSEG001"
+HEADER = struct.Struct("<8sQQ")
+MANIFEST = "manifest.json"
+LOCK = "manifest.lock"
+FORMAT_VERSION = 1
+
+
+def _pad8(n: int) -> int:
+    return (n + 7) & ~7
+
+
+def _atomic_write(path: Path, chunks):
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        for chunk in chunks:
+            f.write(chunk)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+@contextmanager
+def _locked(path: Path):
+    # Exclusive, blocking lock on a side file (released if the process dies)
+    with open(path, "a+b") as f:
+        if os.name == "nt":
+            import msvcrt
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    pass  # LK_LOCK gives up after ~10 s; keep waiting
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def write_segment(path: Path, names, ops, unit_cost, quantity_used, total_cost):
+    n = len(names)
+    offsets = array("q", [0])
+    encoded = []
+    pos = 0
+    for name in names:
+        if "\0" in name:
+            raise ValueError(f"Ingredient name {name!r} contains a NUL character.")
+        b = name.encode("utf-8") + b"\0"
+        encoded.append(b)
+        pos += len(b)
+        offsets.append(pos)
+    blob = b"".join(encoded)
+    _atomic_write(path, [
+        HEADER.pack(MAGIC, n, len(blob)),
+        bytes(array("b", ops)),
+        b"\0" * (_pad8(n) - n),
+        bytes(array("d", unit_cost)),
+        bytes(array("d", quantity_used)),
+        bytes(array("d", total_cost)),
+        bytes(offsets),
+        blob,
+    ])
+
+
+class Segment:
+    def __init__(self, path: Path):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, n, name_bytes = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            self._mm.close()
+            raise ValueError(f"{path} is not an ingredient segment.")
+        self.rows = n
+        mv = memoryview(self._mm)
+        off = HEADER.size
+        self.op = mv[off:off + n].cast("b")
+        off += _pad8(n)
+        cols = []
+        for _ in range(3):
+            cols.append(mv[off:off + 8 * n].cast("d"))
+            off += 8 * n
+        self.unit_cost, self.quantity_used, self.total_cost = cols
+        self.name_offsets = mv[off:off + 8 * (n + 1)].cast("q")
+        off += 8 * (n + 1)
+        self._names = mv[off:off + name_bytes]
+        self._views = [mv, self.op, *cols, self.name_offsets, self._names]
+
+    def name(self, i: int) -> str:
+        return bytes(self._names[self.name_offsets[i]:self.name_offsets[i + 1] - 1]).decode("utf-8")
+
+    def names(self):
+        if not self.rows:
+            return []
+        return bytes(self._names).decode("utf-8").split("\0")[:-1]
+
+    @property
+    def all_upserts(self) -> bool:
+        return b"\0" not in bytes(self.op)
+
+    def close(self):
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._mm.close()
+
+
+class RecipeDB:
+    def __init__(self, root, max_segments: int = 8):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_segments = max_segments
+        self._manifest = self._read_manifest()
+        self._unlink_later = set()  # replaced segments that could not be removed yet
+
+    # ------------------------- Manifest -------------------------
+    def _read_manifest(self):
+        path = self.root / MANIFEST
+        if not path.exists():
+            return {"format": FORMAT_VERSION, "byteorder": sys.byteorder, "tables": {}}
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("format") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported recipe database format {manifest.get('format')!r}.")
+        if manifest.get("byteorder") != sys.byteorder:
+            raise ValueError("Recipe database was written on a machine with a different byte order.")
+        return manifest
+
+    def refresh(self):
+        # Pick up saves made by other RecipeDB instances
+        self._manifest = self._read_manifest()
+
+    def _commit(self, manifest, replaced=()):
+        # Caller holds the lock. replaced: segments this save took out of use.
+        data = json.dumps(manifest, indent=2).encode("utf-8")
+        _atomic_write(self.root / MANIFEST, [data])
+        self._manifest = manifest
+        live = {seg for t in manifest["tables"].values() for seg in t["segments"]}
+        for name in {*replaced, *self._unlink_later} - live:
+            try:
+                (self.root / name).unlink()
+                self._unlink_later.discard(name)
+            except FileNotFoundError:
+                self._unlink_later.discard(name)
+            except OSError:
+                self._unlink_later.add(name)  # e.g. still mapped on Windows
+
+    # ------------------------- Tables -------------------------
+    def tables(self):
+        self.refresh()
+        return list(self._manifest["tables"])
+
+    def meta(self, table) -> dict:
+        return dict(self._manifest["tables"][table].get("meta", {}))
+
+    def open(self, table):
+        # Memory-mapped segments, oldest first. Caller closes them.
+        try:
+            return self._open(table)
+        except FileNotFoundError:
+            self.refresh()  # another instance compacted the table since
+            return self._open(table)
+
+    def _open(self, table):
+        segments = []
+        try:
+            for seg in self._manifest["tables"][table]["segments"]:
+                segments.append(Segment(self.root / seg))
+        except BaseException:
+            for seg in segments:
+                seg.close()
+            raise
+        return segments
+
+    def load_store(self, table) -> IngredientStore:
+        segments = self.open(table)
+        try:
+            base = segments[0] if segments else None
+            if base is not None and base.all_upserts:
+                store = IngredientStore.from_columns(
+                    base.names(), base.unit_cost, base.quantity_used, base.total_cost)
+                rest = segments[1:]
+            else:
+                store = IngredientStore()
+                rest = segments
+            for seg in rest:
+                for i, name in enumerate(seg.names()):
+                    if seg.op[i]:
+                        store.upsert(name, seg.unit_cost[i], seg.quantity_used[i], seg.total_cost[i])
+                    else:
+                        store.delete(name)
+            store.mark_saved()
+            return store
+        finally:
+            for seg in segments:
+                seg.close()
+
+    def save(self, table, store: IngredientStore, meta=None, rewrite=False):
+        with _locked(self.root / LOCK):
+            self._save(table, store, meta, rewrite)
+
+    def _save(self, table, store, meta, rewrite):
+        seen = self._manifest["tables"].get(table)
+        self.refresh()
+        entry = self._manifest["tables"].get(table)
+        cleared, upserted, deleted = store.pending_changes()
+        meta = dict(meta if meta is not None else (entry or {}).get("meta", {}))
+
+        # The store's pending changes are relative to the segments this
+        # instance last saw; if another writer has changed the table since,
+        # write it whole instead of appending to their segments.
+        stale = entry is not None and (seen is None or seen["segments"] != entry["segments"])
+        full = (rewrite or entry is None or stale or cleared
+                or len(entry["segments"]) + 1 > self.max_segments)
+        if not full and not upserted and not deleted:
+            if meta != entry.get("meta", {}):
+                self._commit(self._with_table(table, entry["segments"], meta))
+            return
+
+        seg_name = f"{uuid.uuid4().hex}.seg"
+        if full:
+            rows = list(store.rows())
+            segments = [seg_name]
+            names = [r[0] for r in rows]
+            ops = [1] * len(rows)
+        else:
+            rows = [(name, *store.get(name)) for name in upserted] + [(name, 0.0, 0.0, 0.0) for name in deleted]
+            segments = entry["segments"] + [seg_name]
+            names = [r[0] for r in rows]
+            ops = [1] * len(upserted) + [0] * len(deleted)
+        write_segment(self.root / seg_name, names, ops,
+                      [r[1] for r in rows], [r[2] for r in rows], [r[3] for r in rows])
+        self._commit(self._with_table(table, segments, meta), entry["segments"] if entry else ())
+        store.mark_saved()
+
+    def compact(self, table):
+        with _locked(self.root / LOCK):
+            self.refresh()
+            self._save(table, self.load_store(table), None, rewrite=True)
+
+    def delete_table(self, table):
+        with _locked(self.root / LOCK):
+            self.refresh()
+            manifest = json.loads(json.dumps(self._manifest))
+            entry = manifest["tables"].pop(table, None)
+            if entry is not None:
+                self._commit(manifest, entry["segments"])
+
+    def _with_table(self, table, segments, meta):
+        manifest = json.loads(json.dumps(self._manifest))
+        manifest["tables"][table] = {"segments": segments, "meta": meta}
+        return manifest
+
+
+if __name__ == "__main__":
+    import tempfile
+    import time
+
+    n = 1_000_000
+    store = IngredientStore()
+    for i in range(n):
+        store.upsert(f"ingredient_{i}", 0.01 * (i % 997), 1.0 + i % 5)
+    with tempfile.TemporaryDirectory() as tmp:
+        db = RecipeDB(tmp)
+        start = time.perf_counter()
+        db.save("catalog", store)
+        print(f"full write of {n:,} rows: {time.perf_counter() - start:.2f}s")
+
+        store.upsert("ingredient_5", 9.99, 2.0)
+        store.delete("ingredient_6")
+        start = time.perf_counter()
+        db.save("catalog", store)
+        print(f"incremental save (2 changes): {(time.perf_counter() - start) * 1000:.1f} ms")
+
+        start = time.perf_counter()
+        segments = RecipeDB(tmp).open("catalog")
+        total = segments[0].total_cost[n // 2]
+        print(f"open + read one row (mmap): {(time.perf_counter() - start) * 1000:.2f} ms ({total:.2f})")
+        for seg in segments:
+            seg.close()
+
+        start = time.perf_counter()
+        loaded = RecipeDB(tmp).load_store("catalog")
+        print(f"load into IngredientStore: {time.perf_counter() - start:.2f}s, {len(loaded):,} rows")
+
+    # Two instances on one directory (GUI + a script): neither loses the
+    # other's tables or segments
+    with tempfile.TemporaryDirectory() as tmp:
+        gui, script = RecipeDB(tmp), RecipeDB(tmp)
+        mine = IngredientStore()
+        mine.upsert("flour", 0.5, 2.0)
+        gui.save("default", mine)
+        other = IngredientStore()
+        other.upsert("butter", 3.0, 1.0)
+        script.save("shortbread", other, {"cookie_yield": 24})
+        mine.upsert("sugar", 0.8, 1.0)
+        gui.save("default", mine)
+        reopened = RecipeDB(tmp)
+        assert sorted(reopened.tables()) == ["default", "shortbread"], reopened.tables()
+        assert len(reopened.load_store("shortbread")) == 1 and len(reopened.load_store("default")) == 2
+        script.compact("default")
+        assert len(gui.load_store("default")) == 2  # gui's cached segment list is gone; open() refreshes
+        script.delete_table("shortbread")
+        assert gui.tables() == ["default"] and len(list(Path(tmp).glob("*.seg"))) == 1
+        print("shared directory: ok")
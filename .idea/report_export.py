@@ -0,0 +1,272 @@
+import argparse
+import csv
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import calculations
+
+# Batch report export: for every recipe, a cost table (CSV) and a
+# profit-vs-cost report (PNG chart, PDF chart + cost table), plus one
+# summary.csv for the whole set.
+#
+# Rendering runs in a process pool. Each worker switches matplotlib to the
+# non-interactive Agg backend once, builds its Figures (a PDF page with
+# chart + cost table, a PNG chart) in its initializer and reuses them for
+# every recipe it is handed: per recipe only bar heights, texts and limits
+# change. Recipes are sent in chunks so pickling/IPC is paid per chunk, not
+# per recipe.
+
+FORMATS = ("pdf", "png", "csv")
+LABELS = ["Total Cost", "Total Revenue", "Profit"]
+SUMMARY_COLUMNS = ["recipe", "cookie_yield", "cookie_price", "total_cost", "revenue", "profit",
+                   "profit_per_cookie", "files"]
+
+SUMMARY_STEM = "summary"  # summary.csv; no recipe may use this stem
+
+_WORKER = {}
+
+
+def recipe_summary(rows, cookie_yield, cookie_price):
+    calc = calculations.Calculator()
+    total_cost = calc.sum_line_costs([r[1] for r in rows], [r[2] for r in rows])
+    revenue = calc.calculate_revenue(cookie_price, cookie_yield)
+    profit = calc.calculate_profit(revenue, total_cost)
+    try:
+        profit_per_cookie = calc.profit_per_cookie(profit, cookie_yield)
+    except ValueError:
+        profit_per_cookie = None  # zero yield
+    return {"total_cost": total_cost, "revenue": revenue, "profit": profit,
+            "profit_per_cookie": profit_per_cookie}
+
+
+def file_stem(recipe_id) -> str:
+    stem = re.sub(r"[^A-Za-z0-9._-]+", "_", str(recipe_id)).strip("._") or "recipe"
+    return stem[:120]
+
+
+# ------------------------- Worker -------------------------
+TABLE_ROWS = 28  # what fits under the chart; the CSV has every row
+TABLE_COLUMNS = [("Ingredient", 0.0, "left"), ("Unit Cost", 0.55, "right"),
+                 ("Qty Used", 0.75, "right"), ("Total Cost", 1.0, "right")]
+
+
+def _chart_artists(ax):
+    bars = ax.bar(LABELS, [0.0, 0.0, 0.0])
+    texts = [ax.text(i, 0.0, "", ha="center") for i in range(len(LABELS))]
+    ax.set_ylabel("USD ($)")
+    ax.grid(axis="y", linestyle="--", alpha=0.5)
+    return {"ax": ax, "bars": bars, "texts": texts}
+
+
+def _update_chart(chart, recipe_id, summary):
+    values = [summary["total_cost"], summary["revenue"], summary["profit"]]
+    low, high = min(0.0, min(values)), max(values)
+    span = (high - low) or 1.0
+    for bar, text, v in zip(chart["bars"], chart["texts"], values):
+        bar.set_height(v)
+        text.set_position((bar.get_x() + bar.get_width() / 2, v + (span if v >= 0 else -span) * 0.02))
+        text.set_verticalalignment("bottom" if v >= 0 else "top")
+        text.set_text(f"-${-v:,.2f}" if v < 0 else f"${v:,.2f}")
+    chart["ax"].set_ylim(low - 0.15 * span if low < 0 else 0.0, high + 0.15 * span)
+    chart["ax"].set_title(f"Profit vs Cost: {recipe_id}")
+
+
+def _init_worker(out_dir, formats, dpi):
+    import matplotlib
+    matplotlib.use("Agg", force=True)
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    # PDF page: chart on top, cost table below. The table is one monospace
+    # text block per column (matplotlib's Table lays out every cell on each
+    # draw and was most of the render time).
+    page = Figure(figsize=(8.5, 11), dpi=dpi)
+    FigureCanvasAgg(page)
+    page_chart = _chart_artists(page.add_axes([0.1, 0.55, 0.85, 0.38]))
+    table_ax = page.add_axes([0.08, 0.04, 0.84, 0.44])
+    table_ax.axis("off")
+    for name, x, ha in TABLE_COLUMNS:
+        table_ax.text(x, 1.0, name, ha=ha, va="top", family="monospace", fontsize=9, weight="bold")
+    table_ax.plot([0, 1], [0.975, 0.975], color="0.5", linewidth=0.8)
+    columns = [table_ax.text(x, 0.96, "", ha=ha, va="top", family="monospace", fontsize=8, linespacing=1.5)
+               for _name, x, ha in TABLE_COLUMNS]
+    table_ax.set_xlim(0, 1)
+    table_ax.set_ylim(0, 1)
+
+    # PNG: chart only
+    chart = Figure(figsize=(8, 5), dpi=dpi, layout="tight")
+    FigureCanvasAgg(chart)
+    png_chart = _chart_artists(chart.add_subplot())
+
+    _WORKER.update(out_dir=Path(out_dir), formats=formats, page=page, page_chart=page_chart,
+                   columns=columns, chart=chart, png_chart=png_chart)
+
+
+def _update_table(columns, rows):
+    shown = rows[:TABLE_ROWS]
+    cells = [[name if len(name) <= 40 else name[:39] + "…" for name, *_ in shown],
+             [f"{uc:,.2f}" for _n, uc, _q, _t in shown],
+             [f"{q:,.2f}" for _n, _u, q, _t in shown],
+             [f"{t:,.2f}" for _n, _u, _q, t in shown]]
+    if len(rows) > TABLE_ROWS:
+        cells[0].append(f"... {len(rows) - TABLE_ROWS} more")
+    for text, col in zip(columns, cells):
+        text.set_text("\n".join(col))
+
+
+def _write_csv(path, rows, summary):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["name", "unit_cost", "quantity_used", "total_cost"])
+        writer.writerows(rows)
+        writer.writerow([])
+        for key in ("total_cost", "revenue", "profit", "profit_per_cookie"):
+            writer.writerow([key, "", "", summary[key] if summary[key] is not None else ""])
+
+
+def _render_chunk(chunk):
+    # chunk: list of (recipe_id, rows, cookie_yield, cookie_price)
+    w = _WORKER
+    out = []
+    for recipe_id, rows, cookie_yield, cookie_price in chunk:
+        summary = recipe_summary(rows, cookie_yield, cookie_price)
+        stem = file_stem(recipe_id)
+        files = []
+        if "csv" in w["formats"]:
+            _write_csv(w["out_dir"] / f"{stem}.csv", rows, summary)
+            files.append(f"{stem}.csv")
+        if "pdf" in w["formats"]:
+            _update_chart(w["page_chart"], recipe_id, summary)
+            _update_table(w["columns"], rows)
+            w["page"].savefig(w["out_dir"] / f"{stem}.pdf")
+            files.append(f"{stem}.pdf")
+        if "png" in w["formats"]:
+            _update_chart(w["png_chart"], recipe_id, summary)
+            w["chart"].savefig(w["out_dir"] / f"{stem}.png")
+            files.append(f"{stem}.png")
+        out.append((recipe_id, cookie_yield, cookie_price, summary, files))
+    return out
+
+
+# ------------------------- Public API -------------------------
+def export_reports(recipes, out_dir, formats=FORMATS, workers=None, chunk_size=25, dpi=100, progress=None):
+    # recipes: iterable of (recipe_id, rows, cookie_yield, cookie_price) with
+    # rows as (name, unit_cost, quantity_used, total_cost). Returns the
+    # path of summary.csv. progress(done, total) is called per chunk.
+    formats = tuple(formats)
+    unknown = set(formats) - set(FORMATS)
+    if unknown:
+        raise ValueError(f"Unknown format '{sorted(unknown)[0]}' (use {', '.join(FORMATS)}).")
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    recipes = [(rid, [tuple(r) for r in rows], float(y), float(p)) for rid, rows, y, p in recipes]
+    # Compared case-insensitively: "Sugar" and "sugar" clash on Windows/macOS
+    stems = {}
+    for rid, *_ in recipes:
+        stem = file_stem(rid).lower()
+        if stem == SUMMARY_STEM:
+            raise ValueError(f"Recipe '{rid}' would overwrite {SUMMARY_STEM}.csv; rename it.")
+        if stem in stems and stems[stem] != rid:
+            raise ValueError(f"Recipes '{stems[stem]}' and '{rid}' would write the same files.")
+        stems[stem] = rid
+    chunks = [recipes[i:i + chunk_size] for i in range(0, len(recipes), chunk_size)]
+    workers = max(1, min(workers or os.cpu_count() or 1, len(chunks) or 1))
+
+    results = []
+    if workers == 1:
+        _init_worker(out_dir, formats, dpi)
+        try:
+            for chunk in chunks:
+                results.extend(_render_chunk(chunk))
+                if progress:
+                    progress(len(results), len(recipes))
+        finally:
+            _WORKER.clear()
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(out_dir, formats, dpi)) as pool:
+            for done in pool.map(_render_chunk, chunks):
+                results.extend(done)
+                if progress:
+                    progress(len(results), len(recipes))
+
+    summary_path = out_dir / f"{SUMMARY_STEM}.csv"
+    with open(summary_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(SUMMARY_COLUMNS)
+        for rid, cookie_yield, cookie_price, s, files in results:
+            ppc = "" if s["profit_per_cookie"] is None else s["profit_per_cookie"]
+            writer.writerow([rid, cookie_yield, cookie_price, s["total_cost"], s["revenue"], s["profit"],
+                             ppc, ";".join(files)])
+    return summary_path
+
+
+def recipes_from_db(db):
+    # Every table of a RecipeDB, yield/price from its meta. Unlike
+    # Workspace.from_db a missing yield is kept as 0 (no per-cookie profit).
+    for table in db.tables():
+        meta = db.meta(table)
+        yield (table, list(db.load_store(table).rows()),
+               meta.get("cookie_yield", 0.0), meta.get("cookie_price", 0.0))
+
+
+def recipes_from_workspace(workspace):
+    for recipe_id, recipe in workspace.recipes.items():
+        rows = [(name, workspace.unit_costs[name], qty, workspace.unit_costs[name] * qty)
+                for name, qty in recipe.quantities.items()]
+        yield recipe_id, rows, recipe.cookie_yield, recipe.cookie_price
+
+
+def demo_recipes(n, ingredients=12, seed=0):
+    import random
+
+    rng = random.Random(seed)
+    for i in range(n):
+        rows = []
+        for k in range(ingredients):
+            uc, q = rng.uniform(0.05, 2.0), rng.uniform(0.5, 8.0)
+            rows.append((f"ingredient_{k}", uc, q, uc * q))
+        yield f"recipe_{i:05d}", rows, float(rng.randint(24, 96)), rng.uniform(0.25, 2.0)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export per-recipe cost reports (PDF/PNG/CSV).")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--db", help="recipe database directory (see recipe_db.py)")
+    source.add_argument("--demo", type=int, metavar="N", help="render N synthetic recipes (benchmark)")
+    parser.add_argument("out_dir", help="directory for the report files")
+    parser.add_argument("--formats", default=",".join(FORMATS), help="comma-separated: pdf,png,csv")
+    parser.add_argument("--workers", type=int, help="render processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=25, help="recipes per task")
+    parser.add_argument("--dpi", type=int, default=100)
+    args = parser.parse_args(argv)
+
+    if args.db:
+        from recipe_db import RecipeDB
+        recipes = recipes_from_db(RecipeDB(args.db))
+    else:
+        recipes = demo_recipes(args.demo)
+    formats = [f.strip().lower() for f in args.formats.split(",") if f.strip()]
+
+    start = time.perf_counter()
+
+    def progress(done, total):
+        rate = done / max(time.perf_counter() - start, 1e-9)
+        print(f"\r{done:,}/{total:,} recipes ({rate:.0f}/s)", end="", file=sys.stderr)
+
+    try:
+        summary = export_reports(recipes, args.out_dir, formats, args.workers, args.chunk_size,
+                                 args.dpi, progress)
+    except (ValueError, OSError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    print(f"\nWrote reports in {time.perf_counter() - start:.1f}s; summary: {summary}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,176 @@
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from batch_calc import BatchCalculator, BatchSolver
+
+# What-if sweeps over price, yield and ingredient-cost changes for one recipe.
+# The ingredient columns are put in shared memory once; each worker process
+# maps them read-only and evaluates chunks of scenarios with BatchCalculator.
+#
+#   grid_sweep:        every combination of prices x yields x cost factors
+#   monte_carlo_sweep: random prices/yields plus per-ingredient lognormal
+#                      cost noise, reproducible for a given seed
+
+_SHARED = {}
+
+
+# ------------------------- Shared ingredient arrays -------------------------
+def _share(unit_cost, quantity_used):
+    data = np.vstack([np.asarray(unit_cost, dtype=np.float64),
+                      np.asarray(quantity_used, dtype=np.float64)])
+    shm = shared_memory.SharedMemory(create=True, size=max(data.nbytes, 1))
+    np.ndarray(data.shape, dtype=np.float64, buffer=shm.buf)[:] = data
+    return shm, data.shape
+
+
+def _attach(name, shape):
+    # Worker side. The parent owns (and unlinks) the block. Workers share
+    # the parent's resource tracker, so they must not unregister it there
+    # (the parent's unlink would then hit a KeyError in the tracker);
+    # 3.13+ can skip tracking altogether.
+    if sys.version_info >= (3, 13):
+        shm = shared_memory.SharedMemory(name=name, track=False)
+    else:
+        shm = shared_memory.SharedMemory(name=name)  # re-registering is a no-op
+    _use(shm, shape)
+
+
+def _use(shm, shape):
+    arr = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+    arr.flags.writeable = False
+    _SHARED.update(shm=shm, unit_cost=arr[0], quantity_used=arr[1],
+                   line_cost=arr[0] * arr[1])
+
+
+def _detach():
+    _SHARED.clear()
+
+
+# ------------------------- Work units -------------------------
+def _grid_chunk(args):
+    start, stop, prices, yields, cost_factors = args
+    shape = (len(cost_factors), len(yields), len(prices))
+    ci, yi, pi = np.unravel_index(np.arange(start, stop), shape)
+    base = _SHARED["line_cost"].sum()
+    result = BatchCalculator.evaluate(base * cost_factors[ci], yields[yi], prices[pi], invalid="mask")
+    return start, result["profit"]
+
+
+def _monte_carlo_chunk(args):
+    start, stop, seed, price_range, yield_range, cost_sigma = args
+    rng = np.random.default_rng(seed)
+    n = stop - start
+    price = rng.uniform(price_range[0], price_range[1], n)
+    cookie_yield = rng.integers(int(yield_range[0]), int(yield_range[1]) + 1, n).astype(float)
+    line_cost = _SHARED["line_cost"]
+    if cost_sigma > 0:
+        noise = rng.lognormal(0.0, cost_sigma, (n, line_cost.size))
+        total_cost = noise @ line_cost
+    else:
+        total_cost = np.full(n, line_cost.sum())
+    result = BatchCalculator.evaluate(total_cost, cookie_yield, price, invalid="mask")
+    return start, price, cookie_yield, total_cost, result["profit"]
+
+
+def _run(work, fn, shm, shape, workers):
+    if workers == 1:
+        _use(shm, shape)  # the parent's own mapping, no second handle
+        try:
+            return [fn(w) for w in work]
+        finally:
+            _detach()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_attach, initargs=(shm.name, shape)) as pool:
+        return list(pool.map(fn, work))
+
+
+# ------------------------- Public API -------------------------
+def grid_sweep(unit_cost, quantity_used, prices, yields, cost_factors=(1.0,),
+               workers=None, chunk_size=250_000):
+    # profit[c, y, p] for cost_factors[c], yields[y], prices[p]
+    # break_even_price[c, y] is the price where profit is zero
+    prices = np.asarray(prices, dtype=float)
+    yields = np.asarray(yields, dtype=float)
+    cost_factors = np.asarray(cost_factors, dtype=float)
+    n = len(cost_factors) * len(yields) * len(prices)
+    workers = workers or os.cpu_count() or 1
+
+    shm, shape = _share(unit_cost, quantity_used)
+    try:
+        work = [(s, min(s + chunk_size, n), prices, yields, cost_factors)
+                for s in range(0, n, chunk_size)]
+        profit = np.empty(n)
+        for start, chunk in _run(work, _grid_chunk, shm, shape, workers):
+            profit[start:start + len(chunk)] = chunk
+    finally:
+        shm.close()
+        shm.unlink()
+
+    base = float(np.dot(np.asarray(unit_cost, float), np.asarray(quantity_used, float)))
+    return {
+        "prices": prices,
+        "yields": yields,
+        "cost_factors": cost_factors,
+        "profit": profit.reshape(len(cost_factors), len(yields), len(prices)),
+        "break_even_price": BatchSolver.break_even_price(base * cost_factors[:, None], yields[None, :], "mask"),
+    }
+
+
+def monte_carlo_sweep(unit_cost, quantity_used, n_samples, price_range, yield_range,
+                      cost_sigma=0.1, seed=0, workers=None, chunk_size=None):
+    workers = workers or os.cpu_count() or 1
+    n_ingredients = max(len(unit_cost), 1)
+    # Keep each worker's noise matrix around 32 MB
+    chunk_size = chunk_size or max(1_000, 4_000_000 // n_ingredients)
+
+    starts = list(range(0, n_samples, chunk_size))
+    seeds = np.random.SeedSequence(seed).spawn(len(starts))
+    work = [(s, min(s + chunk_size, n_samples), seeds[i], tuple(price_range), tuple(yield_range), cost_sigma)
+            for i, s in enumerate(starts)]
+
+    out = {k: np.empty(n_samples) for k in ("price", "cookie_yield", "total_cost", "profit")}
+    shm, shape = _share(unit_cost, quantity_used)
+    try:
+        for start, price, cookie_yield, total_cost, profit in _run(work, _monte_carlo_chunk, shm, shape, workers):
+            stop = start + len(price)
+            out["price"][start:stop] = price
+            out["cookie_yield"][start:stop] = cookie_yield
+            out["total_cost"][start:stop] = total_cost
+            out["profit"][start:stop] = profit
+    finally:
+        shm.close()
+        shm.unlink()
+
+    out["break_even_price"] = BatchSolver.break_even_price(out["total_cost"], out["cookie_yield"], "mask")
+    profit = out["profit"]
+    out["summary"] = {
+        "mean_profit": float(np.nanmean(profit)),
+        "p5_profit": float(np.nanpercentile(profit, 5)),
+        "p50_profit": float(np.nanpercentile(profit, 50)),
+        "p95_profit": float(np.nanpercentile(profit, 95)),
+        "loss_probability": float(np.mean(profit < 0)),
+        "p95_break_even_price": float(np.nanpercentile(out["break_even_price"], 95)),
+    }
+    return out
+
+
+# ------------------------- Benchmark -------------------------
+if __name__ == "__main__":
+    rng = np.random.default_rng(1)
+    n_ing = 200
+    unit_cost = rng.uniform(0.05, 2.0, n_ing)
+    qty = rng.uniform(0.1, 4.0, n_ing)
+    samples = 2_000_000
+
+    baseline = None
+    for w in (1, 2, 4, 8):
+        start = time.perf_counter()
+        res = monte_carlo_sweep(unit_cost, qty, samples, (0.25, 3.0), (24, 96), cost_sigma=0.15, workers=w)
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(f"{w} worker(s): {samples:,} scenarios x {n_ing} ingredients in {elapsed:.2f}s "
+              f"(x{baseline / elapsed:.2f}), loss probability {res['summary']['loss_probability']:.3f}")
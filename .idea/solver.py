@@ -0,0 +1,39 @@
+import math
+import calculations
+
+
+class Solver:
+    # Closed-form answers to "what price/yield do I need?" for one batch,
+    # derived from revenue = price * cookie_yield and profit = revenue - cost.
+    # Validation follows Calculator: bad inputs raise ValueError.
+
+    @staticmethod
+    def break_even_price(total_cost: float, cookie_yield: float) -> float:
+        if cookie_yield <= 0:
+            raise ValueError("Cookies per batch must be > 0 to find a break-even price.")
+        return total_cost / cookie_yield
+
+    @staticmethod
+    def break_even_yield(total_cost: float, price: float, whole_cookies: bool = False) -> float:
+        if price <= 0:
+            raise ValueError("Price per cookie must be > 0 to break even.")
+        cookies = total_cost / price
+        return float(math.ceil(cookies)) if whole_cookies else cookies
+
+    @staticmethod
+    def price_for_profit(total_cost: float, cookie_yield: float, target_profit: float) -> float:
+        return Solver.break_even_price(total_cost + target_profit, cookie_yield)
+
+    @staticmethod
+    def price_for_margin(total_cost: float, cookie_yield: float, margin: float) -> float:
+        # margin is profit / revenue, e.g. 0.30 for 30%
+        if margin >= 1:
+            raise ValueError("Target margin must be below 100%.")
+        return Solver.break_even_price(total_cost / (1 - margin), cookie_yield)
+
+    @staticmethod
+    def margin(total_cost: float, price: float, cookie_yield: float) -> float:
+        revenue = calculations.Calculator.calculate_revenue(price, cookie_yield)
+        if revenue <= 0:
+            raise ValueError("Revenue must be > 0 to compute a margin.")
+        return calculations.Calculator.calculate_profit(revenue, total_cost) / revenue
@@ -0,0 +1,57 @@
+class TreeRowSync:
+    # Keeps a ttk.Treeview in step with rows keyed by ingredient name.
+    # Each name gets a stable item id, and sync() only touches the items
+    # whose displayed values changed instead of deleting and reinserting
+    # every row.
+
+    def __init__(self, tree):
+        self.tree = tree
+        self._items = {}     # name -> item id
+        self._values = {}    # item id -> values tuple currently shown
+        self._next_id = 0
+
+    def item_for(self, name):
+        return self._items.get(name)
+
+    def rename(self, old_name, new_name):
+        # Move the item to the new key so the row keeps its id and selection.
+        item = self._items.pop(old_name, None)
+        if item is not None:
+            self._items[new_name] = item
+
+    def clear(self):
+        self.tree.delete(*self._items.values())
+        self._items.clear()
+        self._values.clear()
+
+    def sync(self, rows):
+        # rows: iterable of (name, values) in display order.
+        # Returns (inserted, updated, removed) counts.
+        wanted = dict(rows)
+        removed = [name for name in self._items if name not in wanted]
+        if len(removed) == len(self._items) and removed:
+            self.clear()
+        elif removed:
+            self.tree.delete(*(self._items[name] for name in removed))
+            for name in removed:
+                self._values.pop(self._items.pop(name), None)
+
+        inserted = updated = 0
+        for pos, (name, values) in enumerate(wanted.items()):
+            item = self._items.get(name)
+            if item is None:
+                item = f"ing{self._next_id}"
+                self._next_id += 1
+                self.tree.insert("", pos, iid=item, values=values)
+                self._items[name] = item
+                self._values[item] = values
+                inserted += 1
+            elif self._values[item] != values:
+                self.tree.item(item, values=values)
+                self._values[item] = values
+                updated += 1
+        return inserted, updated, len(removed)
+
+
+def format_row(name, unit_cost, quantity_used, total_cost):
+    return (name, f"{unit_cost:.2f}", f"{quantity_used:.2f}", f"{total_cost:.2f}")
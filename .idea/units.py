@@ -0,0 +1,236 @@
+import numpy as np
+
+# Units of measure for pack prices and recipe quantities. Every unit
+# belongs to one dimension and has a factor to that dimension's base unit:
+#
+#   mass    gram (g)
+#   volume  millilitre (ml)
+#   count   each
+#
+# Conversions inside a dimension come from a precomputed unit x unit factor
+# matrix. Crossing dimensions (cups of flour -> grams, eggs -> grams) needs
+# the ingredient: its density (g/ml) and/or mass per piece (g/each) fill a
+# per-ingredient 3 x 3 bridge matrix between the base units. Converting a
+# whole column is then two fancy-indexing lookups and a multiply.
+
+MASS, VOLUME, COUNT = 0, 1, 2
+DIMENSIONS = ("mass", "volume", "count")
+
+# name -> (dimension, size in base units)
+UNITS = {
+    "g": (MASS, 1.0), "gram": (MASS, 1.0), "grams": (MASS, 1.0),
+    "mg": (MASS, 0.001),
+    "kg": (MASS, 1000.0),
+    "oz": (MASS, 28.349523125),
+    "lb": (MASS, 453.59237), "pound": (MASS, 453.59237), "pounds": (MASS, 453.59237),
+    "stick": (MASS, 113.3980925), "sticks": (MASS, 113.3980925),  # US butter stick, 1/4 lb
+    "ml": (VOLUME, 1.0), "l": (VOLUME, 1000.0),
+    "tsp": (VOLUME, 4.92892159375), "tbsp": (VOLUME, 14.78676478125),
+    "fl_oz": (VOLUME, 29.5735295625), "cup": (VOLUME, 236.5882365), "cups": (VOLUME, 236.5882365),
+    "pint": (VOLUME, 473.176473), "quart": (VOLUME, 946.352946), "gallon": (VOLUME, 3785.411784),
+    "each": (COUNT, 1.0), "ea": (COUNT, 1.0), "count": (COUNT, 1.0),
+    "dozen": (COUNT, 12.0),
+}
+
+# Typical values for the seed ingredients: (g per ml, g per each)
+DEFAULT_INGREDIENTS = {
+    "egg": (1.03, 50.0),
+    "butter": (0.911, None),
+    "flour": (0.53, None),
+    "sugar": (0.85, None),
+    "powdered_sugar": (0.56, None),
+    "vanilla": (0.88, None),
+    "milk": (1.03, None),
+    "water": (1.0, None),
+}
+
+
+class UnitError(ValueError):
+    pass
+
+
+def _lookup_codes(values, lookup):
+    # Column of names -> int codes, looking up each distinct name once
+    try:
+        import pandas as pd
+    except ImportError:
+        return np.fromiter((lookup(v) for v in np.asarray(values, dtype=object).ravel()),
+                           dtype=np.intp).reshape(np.shape(values))
+    codes, uniques = pd.factorize(np.asarray(values, dtype=object).ravel())
+    return np.array([lookup(v) for v in uniques], dtype=np.intp)[codes].reshape(np.shape(values))
+
+
+class UnitRegistry:
+    def __init__(self, units=None, ingredients=None):
+        self._units = {}        # name -> index
+        self._dims = []
+        self._sizes = []
+        self._ingredients = {}  # name -> index (0 is "no ingredient")
+        self._density = [np.nan]
+        self._unit_mass = [np.nan]
+        self._matrix = None
+        self._bridge = None
+        for name, (dim, size) in (units or UNITS).items():
+            self.add_unit(name, dim, size)
+        for name, (density, unit_mass) in (ingredients or DEFAULT_INGREDIENTS).items():
+            self.set_ingredient(name, density, unit_mass)
+
+    # ------------------------- Definitions -------------------------
+    def add_unit(self, name, dimension: int, size: float):
+        if dimension not in (MASS, VOLUME, COUNT):
+            raise UnitError(f"Unknown dimension {dimension!r}.")
+        if size <= 0:
+            raise UnitError("Unit size must be > 0.")
+        key = name.strip().lower()
+        if key in self._units:
+            i = self._units[key]
+            self._dims[i], self._sizes[i] = dimension, size
+        else:
+            self._units[key] = len(self._dims)
+            self._dims.append(dimension)
+            self._sizes.append(size)
+        self._matrix = None
+
+    def set_ingredient(self, name, density: float = None, unit_mass: float = None):
+        # density in g/ml, unit_mass in g per piece; None leaves it unknown
+        for value in (density, unit_mass):
+            if value is not None and value <= 0:
+                raise UnitError("Density and mass per piece must be > 0.")
+        i = self._ingredients.get(name)
+        if i is None:
+            i = self._ingredients[name] = len(self._density)
+            self._density.append(np.nan)
+            self._unit_mass.append(np.nan)
+        self._density[i] = np.nan if density is None else density
+        self._unit_mass[i] = np.nan if unit_mass is None else unit_mass
+        self._bridge = None
+
+    def dimension(self, unit) -> str:
+        return DIMENSIONS[self._dims[self.unit_code(unit)]]
+
+    # ------------------------- Lookup tables -------------------------
+    @property
+    def matrix(self) -> np.ndarray:
+        # [from, to] -> factor, NaN across dimensions
+        if self._matrix is None:
+            dims = np.array(self._dims)
+            sizes = np.array(self._sizes, dtype=float)
+            m = sizes[:, None] / sizes[None, :]
+            m[dims[:, None] != dims[None, :]] = np.nan
+            self._matrix = m
+        return self._matrix
+
+    @property
+    def bridge(self) -> np.ndarray:
+        # [ingredient, from dim, to dim] -> base-unit factor (1 on the diagonal)
+        if self._bridge is None:
+            density = np.array(self._density, dtype=float)
+            unit_mass = np.array(self._unit_mass, dtype=float)
+            b = np.full((len(density), 3, 3), np.nan)
+            for d in range(3):
+                b[:, d, d] = 1.0
+            b[:, MASS, VOLUME] = 1.0 / density
+            b[:, VOLUME, MASS] = density
+            b[:, COUNT, MASS] = unit_mass
+            b[:, MASS, COUNT] = 1.0 / unit_mass
+            b[:, COUNT, VOLUME] = unit_mass / density
+            b[:, VOLUME, COUNT] = density / unit_mass
+            self._bridge = b
+        return self._bridge
+
+    def unit_code(self, unit) -> int:
+        try:
+            return self._units[unit.strip().lower()]
+        except KeyError:
+            raise UnitError(f"Unknown unit '{unit}'.") from None
+
+    def unit_codes(self, units) -> np.ndarray:
+        if isinstance(units, str):
+            return np.intp(self.unit_code(units))
+        return _lookup_codes(units, self.unit_code)
+
+    def ingredient_codes(self, names) -> np.ndarray:
+        # Unknown ingredients map to 0 (same-dimension conversions only)
+        if names is None:
+            return np.intp(0)
+        if isinstance(names, str):
+            return np.intp(self._ingredients.get(names, 0))
+        return _lookup_codes(names, lambda n: self._ingredients.get(n, 0))
+
+    # ------------------------- Conversion -------------------------
+    def factors(self, from_units, to_units, ingredients=None) -> np.ndarray:
+        # Multiplier taking an amount in from_units to to_units, elementwise.
+        # Units and ingredients may be single strings or columns.
+        src = self.unit_codes(from_units)
+        dst = self.unit_codes(to_units)
+        factor = self.matrix[src, dst]
+        cross = np.isnan(factor)
+        if np.any(cross):
+            dims = np.array(self._dims)
+            sizes = np.array(self._sizes, dtype=float)
+            ing = np.broadcast_to(self.ingredient_codes(ingredients), np.shape(factor))
+            src_b, dst_b = np.broadcast_to(src, np.shape(factor)), np.broadcast_to(dst, np.shape(factor))
+            via = sizes[src_b] * self.bridge[ing, dims[src_b], dims[dst_b]] / sizes[dst_b]
+            factor = np.where(cross, via, factor)
+            if np.any(np.isnan(factor)):
+                bad = np.flatnonzero(np.isnan(np.ravel(factor)))[0]
+                raise UnitError(self._missing_message(np.ravel(src_b)[bad], np.ravel(dst_b)[bad],
+                                                      np.ravel(ing)[bad]))
+        return factor
+
+    def factor(self, from_unit, to_unit, ingredient=None) -> float:
+        return float(self.factors(from_unit, to_unit, ingredient))
+
+    def convert(self, values, from_units, to_units, ingredients=None) -> np.ndarray:
+        return np.asarray(values, dtype=float) * self.factors(from_units, to_units, ingredients)
+
+    def cost_per_unit(self, cost, pack_size, pack_unit, recipe_unit, ingredients=None) -> np.ndarray:
+        # Price of one recipe_unit, from a pack of pack_size pack_units
+        # costing cost (e.g. butter: 12.18 for 16 sticks, used in tbsp).
+        pack_size = np.asarray(pack_size, dtype=float)
+        if np.any(pack_size <= 0):
+            raise UnitError("Pack size must be > 0.")
+        in_recipe_units = pack_size * self.factors(pack_unit, recipe_unit, ingredients)
+        return np.asarray(cost, dtype=float) / in_recipe_units
+
+    def _missing_message(self, src, dst, ing):
+        names = {i: n for n, i in self._units.items()}
+        what = next((n for n, i in self._ingredients.items() if i == ing), None)
+        needs = {frozenset((MASS, VOLUME)): "a density",
+                 frozenset((MASS, COUNT)): "a mass per piece"}.get(
+            frozenset((self._dims[src], self._dims[dst])), "a density and a mass per piece")
+        if what is None:
+            return (f"Cannot convert '{names[src]}' to '{names[dst]}' without an ingredient "
+                    f"that has {needs}.")
+        return f"Cannot convert '{names[src]}' to '{names[dst]}': '{what}' needs {needs}."
+
+
+registry = UnitRegistry()
+
+
+if __name__ == "__main__":
+    import time
+
+    n = 1_000_000
+    rng = np.random.default_rng(0)
+    names = np.array(list(DEFAULT_INGREDIENTS))[rng.integers(0, len(DEFAULT_INGREDIENTS), n)]
+    src = np.array(["lb", "kg", "oz", "g"])[rng.integers(0, 4, n)]
+    dst = np.array(["cup", "tbsp", "g", "oz"])[rng.integers(0, 4, n)]
+    names[names == "egg"] = "milk"  # eggs have no lb -> cup path worth testing here
+    values = rng.uniform(0.1, 10.0, n)
+    # object columns, as pandas hands them over
+    names, src, dst = names.astype(object), src.astype(object), dst.astype(object)
+    registry.convert(values[:10], src[:10], dst[:10], names[:10])  # warm-up (imports)
+
+    start = time.perf_counter()
+    vectorized = registry.convert(values, src, dst, names)
+    vec_s = time.perf_counter() - start
+
+    rows = 100_000
+    start = time.perf_counter()
+    looped = [v * registry.factor(s, d, i) for v, s, d, i in
+              zip(values[:rows].tolist(), src[:rows], dst[:rows], names[:rows])]
+    loop_s = (time.perf_counter() - start) * n / rows
+    assert np.allclose(looped, vectorized[:rows])
+    print(f"{n:,} conversions: vectorized {vec_s * 1000:.0f} ms, row by row ~{loop_s:.1f} s "
+          f"(x{loop_s / vec_s:.0f})")
@@ -0,0 +1,163 @@
+from table_sync import format_row
+
+DEFAULT_ROW_HEIGHT = 20
+HEADING_HEIGHT = 24
+
+
+class VirtualTable:
+    # Virtual-scrolling mode for a ttk.Treeview backed by an IngredientStore.
+    # The tree only ever holds one item per visible line ("v0", "v1", ...);
+    # scrolling moves a row offset and rewrites those items from the store.
+    # Items keep the ingredient name in the "name" column, so code that reads
+    # tree.set(item, "name") or item values (cell editing, Delete key, the
+    # editor form) works the same as in the normal table.
+
+    def __init__(self, tree, scrollbar, store, before_scroll=None):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.store = store
+        self.before_scroll = before_scroll
+        self.active = False
+        self.offset = 0
+        self._slots = []
+        self._visible = set()
+        self._selected_name = None
+
+        for seq in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            tree.bind(seq, self._on_wheel, add="+")
+        tree.bind("<Up>", lambda e: self._on_arrow(-1), add="+")
+        tree.bind("<Down>", lambda e: self._on_arrow(1), add="+")
+        tree.bind("<Prior>", lambda e: self._scroll(-self.page_size()), add="+")
+        tree.bind("<Next>", lambda e: self._scroll(self.page_size()), add="+")
+        tree.bind("<Configure>", lambda e: self.active and self.refresh(), add="+")
+        tree.bind("<<TreeviewSelect>>", self._remember_selection, add="+")
+
+    # ------------------------- Mode switching -------------------------
+    def activate(self):
+        if self.active:
+            return
+        self.tree.delete(*self.tree.get_children())
+        self.active = True
+        self.offset = 0
+        self.tree.configure(yscrollcommand="")
+        self.scrollbar.configure(command=self.yview)
+
+    def deactivate(self):
+        if not self.active:
+            return
+        self.active = False
+        self._clear_slots()
+        self._selected_name = None
+        self.scrollbar.configure(command=self.tree.yview)
+        self.tree.configure(yscrollcommand=self.scrollbar.set)
+
+    # ------------------------- Rendering -------------------------
+    def page_size(self) -> int:
+        try:
+            row_h = int(self.tree.winfo_toplevel().tk.call(
+                "ttk::style", "lookup", "Treeview", "-rowheight") or DEFAULT_ROW_HEIGHT)
+        except Exception:
+            row_h = DEFAULT_ROW_HEIGHT
+        fitted = (self.tree.winfo_height() - HEADING_HEIGHT) // max(row_h, 1)
+        return max(int(self.tree.cget("height")), fitted, 1)
+
+    def refresh(self):
+        total = len(self.store)
+        page = self.page_size()
+        self.offset = max(0, min(self.offset, total - page))
+        count = max(0, min(page, total - self.offset))
+
+        while len(self._slots) < count:
+            self._slots.append(self.tree.insert("", "end", iid=f"v{len(self._slots)}"))
+        while len(self._slots) > count:
+            self.tree.delete(self._slots.pop())
+
+        reselect = None
+        self._visible = set()
+        for i, item in enumerate(self._slots):
+            row = self.store.row_at(self.offset + i)
+            self.tree.item(item, values=format_row(*row))
+            self._visible.add(row[0])
+            if row[0] == self._selected_name:
+                reselect = item
+
+        selected = self.tree.selection()
+        if reselect is not None:
+            if selected != (reselect,):
+                self.tree.selection_set(reselect)
+                self.tree.focus(reselect)
+        elif selected:
+            # Selected row scrolled out of view; _selected_name still holds it
+            self.tree.selection_remove(selected)
+
+        if total:
+            self.scrollbar.set(self.offset / total, (self.offset + count) / total)
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def _clear_slots(self):
+        if self._slots:
+            self.tree.delete(*self._slots)
+        self._slots = []
+        self._visible = set()
+
+    # ------------------------- Scrolling -------------------------
+    def yview(self, *args):
+        # Scrollbar command protocol: ("moveto", fraction) or ("scroll", n, "units"/"pages")
+        if not args:
+            return
+        if args[0] == "moveto":
+            self._scroll_to(int(float(args[1]) * len(self.store)))
+        elif args[0] == "scroll":
+            amount = int(args[1])
+            if args[2] == "pages":
+                amount *= self.page_size()
+            self._scroll(amount)
+
+    def _scroll(self, amount):
+        if not self.active:
+            return None
+        self._scroll_to(self.offset + amount)
+        return "break"
+
+    def _scroll_to(self, offset):
+        if self.before_scroll is not None:
+            self.before_scroll()
+        self.offset = offset
+        self.refresh()
+
+    def _on_wheel(self, event):
+        if not self.active:
+            return None
+        if event.num == 4:
+            step = -3
+        elif event.num == 5:
+            step = 3
+        else:
+            step = -3 if event.delta > 0 else 3
+        return self._scroll(step)
+
+    def _on_arrow(self, direction):
+        if not self.active:
+            return None
+        focus = self.tree.focus()
+        at_edge = (not self._slots or
+                   (direction < 0 and focus == self._slots[0]) or
+                   (direction > 0 and focus == self._slots[-1]))
+        if not at_edge:
+            return None  # let the Treeview move the selection inside the window
+        if self._selected_name is not None:
+            pos = self.store.position_of(self._selected_name)
+            if pos is not None and 0 <= pos + direction < len(self.store):
+                self._selected_name = self.store.row_at(pos + direction)[0]
+        return self._scroll(direction)
+
+    def _remember_selection(self, _evt):
+        if not self.active:
+            return
+        sel = self.tree.selection()
+        if sel:
+            self._selected_name = self.tree.set(sel[0], "name")
+        elif self._selected_name in self._visible:
+            # Deselected by the user (not scrolled away)
+            self._selected_name = None
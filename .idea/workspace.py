@@ -0,0 +1,154 @@
+import math
+from collections import defaultdict
+
+import calculations
+from ingredient_store import IngredientStore
+
+
+class Recipe:
+    def __init__(self, recipe_id, cookie_yield: float, cookie_price: float):
+        self.recipe_id = recipe_id
+        self.cookie_yield = cookie_yield
+        self.cookie_price = cookie_price
+        self.quantities = {}  # ingredient id -> quantity used
+
+
+class Workspace:
+    # Many recipes over one shared ingredient price catalog. Recipes hold
+    # only quantities keyed by ingredient id; unit costs live once in the
+    # catalog. A reverse index (ingredient id -> recipe ids) means a price
+    # change recomputes only the recipes that use that ingredient.
+
+    def __init__(self):
+        self.calc = calculations.Calculator()
+        self.unit_costs = {}            # ingredient id -> unit cost
+        self.recipes = {}               # recipe id -> Recipe
+        self._used_by = defaultdict(set)
+        self._totals = {}               # recipe id -> total cost
+        self.recomputed = 0             # recipe totals recomputed so far
+
+    # ------------------------- Catalog -------------------------
+    def set_price(self, ingredient_id, unit_cost: float):
+        # Returns the recipe ids whose totals changed
+        return self.set_prices({ingredient_id: unit_cost})
+
+    def set_prices(self, prices: dict):
+        for unit_cost in prices.values():
+            if unit_cost < 0:
+                raise ValueError("Unit cost must be positive.")
+        affected = set()
+        for ingredient_id, unit_cost in prices.items():
+            self.unit_costs[ingredient_id] = unit_cost
+            affected |= self._used_by.get(ingredient_id, set())
+        for recipe_id in affected:
+            self._recompute(recipe_id)
+        return affected
+
+    def remove_ingredient(self, ingredient_id):
+        users = self._used_by.get(ingredient_id)
+        if users:
+            raise ValueError(f"Ingredient '{ingredient_id}' is used by {len(users)} recipe(s).")
+        self.unit_costs.pop(ingredient_id, None)
+        self._used_by.pop(ingredient_id, None)
+
+    def recipes_using(self, ingredient_id):
+        return set(self._used_by.get(ingredient_id, ()))
+
+    # ------------------------- Recipes -------------------------
+    def add_recipe(self, recipe_id, quantities: dict, cookie_yield: float, cookie_price: float):
+        if recipe_id in self.recipes:
+            raise ValueError(f"Recipe '{recipe_id}' already exists.")
+        missing = [i for i in quantities if i not in self.unit_costs]
+        if missing:
+            raise KeyError(f"Unknown ingredient '{missing[0]}'; add its price to the catalog first.")
+        for ingredient_id, qty in quantities.items():
+            try:
+                valid = math.isfinite(qty) and qty >= 0
+            except TypeError:
+                valid = False
+            if not valid:
+                raise ValueError(f"Quantity used of '{ingredient_id}' in '{recipe_id}' must be a "
+                                 f"positive number (got {qty!r}).")
+        recipe = Recipe(recipe_id, cookie_yield, cookie_price)
+        self.recipes[recipe_id] = recipe
+        for ingredient_id, qty in quantities.items():
+            recipe.quantities[ingredient_id] = qty
+            self._used_by[ingredient_id].add(recipe_id)
+        self._recompute(recipe_id)
+        return recipe
+
+    def set_quantity(self, recipe_id, ingredient_id, quantity_used: float):
+        # quantity_used=None (or 0) removes the ingredient from the recipe
+        recipe = self.recipes[recipe_id]
+        if quantity_used:
+            if ingredient_id not in self.unit_costs:
+                raise KeyError(f"Unknown ingredient '{ingredient_id}'.")
+            if not math.isfinite(quantity_used) or quantity_used < 0:
+                raise ValueError("Quantity used must be positive.")
+            recipe.quantities[ingredient_id] = quantity_used
+            self._used_by[ingredient_id].add(recipe_id)
+        else:
+            recipe.quantities.pop(ingredient_id, None)
+            self._used_by[ingredient_id].discard(recipe_id)
+        self._recompute(recipe_id)
+
+    def remove_recipe(self, recipe_id):
+        recipe = self.recipes.pop(recipe_id)
+        for ingredient_id in recipe.quantities:
+            self._used_by[ingredient_id].discard(recipe_id)
+        self._totals.pop(recipe_id, None)
+
+    # ------------------------- Results -------------------------
+    def total_cost(self, recipe_id) -> float:
+        return self._totals[recipe_id]
+
+    def summary(self, recipe_id) -> dict:
+        recipe = self.recipes[recipe_id]
+        total_cost = self._totals[recipe_id]
+        revenue = self.calc.calculate_revenue(recipe.cookie_price, recipe.cookie_yield)
+        profit = self.calc.calculate_profit(revenue, total_cost)
+        return {
+            "total_cost": total_cost,
+            "revenue": revenue,
+            "profit": profit,
+            "profit_per_cookie": self.calc.profit_per_cookie(profit, recipe.cookie_yield),
+        }
+
+    def _recompute(self, recipe_id):
+        quantities = self.recipes[recipe_id].quantities
+        self._totals[recipe_id] = self.calc.sum_line_costs(
+            (self.unit_costs[i] for i in quantities), quantities.values())
+        self.recomputed += 1
+
+    # ------------------------- IngredientStore bridge -------------------------
+    def recipe_store(self, recipe_id) -> IngredientStore:
+        # One recipe as the single-recipe table the GUI edits
+        store = IngredientStore()
+        for ingredient_id, qty in self.recipes[recipe_id].quantities.items():
+            store.upsert(ingredient_id, self.unit_costs[ingredient_id], qty)
+        return store
+
+    def add_recipe_from_store(self, recipe_id, store: IngredientStore, cookie_yield: float,
+                              cookie_price: float):
+        # Ingredients are matched by name; a recipe's unit cost only seeds the
+        # catalog when that ingredient is not priced yet.
+        for name, unit_cost, _qty, _total in store.rows():
+            self.unit_costs.setdefault(name, unit_cost)
+        return self.add_recipe(recipe_id, {name: qty for name, _u, qty, _t in store.rows()},
+                               cookie_yield, cookie_price)
+
+    @classmethod
+    def from_db(cls, db):
+        # Every table of a RecipeDB becomes a recipe (yield/price from its
+        # meta). A table saved without a yield is rejected here, naming it,
+        # rather than failing later in summary().
+        workspace = cls()
+        for table in db.tables():
+            meta = db.meta(table)
+            cookie_yield = meta.get("cookie_yield")
+            if cookie_yield is None or not math.isfinite(cookie_yield) or cookie_yield <= 0:
+                raise ValueError(f"Recipe '{table}' has no cookie yield (got {cookie_yield!r}); "
+                                 "save it with a yield > 0.")
+            workspace.add_recipe_from_store(table, db.load_store(table),
+                                            cookie_yield, meta.get("cookie_price", 0.0))
+        return workspace